@@ -0,0 +1,104 @@
+"""Cost of CORS preflights and how many of them ``CORS_MAX_AGE`` saves.
+
+Times a preflight answered by ``src.core.cors.CORSMiddleware`` against
+the same ``OPTIONS`` request dispatched through Flask (the request hooks
+and routing every preflight used to go through), the CORS overhead on
+an ordinary cross-origin request, and the origin matcher on its own.
+Before the timings it prints the preflights a browser sends per hour
+with and without a preflight max-age. Run with ``python -m
+benchmarks.cors``; see ``benchmarks.harness`` for saving and comparing
+results.
+"""
+import math
+from typing import Callable, Dict, Iterator
+
+from werkzeug.test import EnvironBuilder
+
+from benchmarks.harness import Case, main
+from src.app import create_app
+from src.config.settings import settings
+from src.core.cors import OriginMatcher
+
+ORIGIN = "https://app.example.com"
+PREFLIGHT_HEADERS = {
+    "Origin": ORIGIN,
+    "Access-Control-Request-Method": "GET",
+    "Access-Control-Request-Headers": "Authorization",
+}
+# Preflight cache lifetime browsers use when the response sets none, and
+# the longest one Chromium accepts
+BROWSER_DEFAULT_MAX_AGE = 5
+BROWSER_MAX_AGE_CAP = 7200
+
+
+def _start_response(status, headers, exc_info=None):
+    pass
+
+
+def _call(wsgi_app: Callable, environ: Dict) -> Callable[[], object]:
+    def call():
+        # WSGI apps may store per-request state in the environ
+        for _ in wsgi_app(dict(environ), _start_response):
+            pass
+
+    return call
+
+
+def request_cases() -> Iterator[Case]:
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://", "SQLALCHEMY_BINDS": {}})
+    middleware = app.wsgi_app
+    flask_only = app.wsgi_app.wsgi_app
+    path = "/api/v1/protected/user-info"
+
+    preflight = EnvironBuilder(
+        path=path, method="OPTIONS", headers=PREFLIGHT_HEADERS
+    ).get_environ()
+    yield "preflight [CORS middleware]", _call(middleware, preflight)
+    yield "OPTIONS [Flask dispatch]", _call(flask_only, preflight)
+
+    request = EnvironBuilder(path="/health").get_environ()
+    cross_origin = EnvironBuilder(
+        path="/health", headers={"Origin": ORIGIN}
+    ).get_environ()
+    yield "GET /health [same origin]", _call(middleware, request)
+    yield "GET /health [cross-origin]", _call(middleware, cross_origin)
+
+
+def matcher_cases() -> Iterator[Case]:
+    origins = [f"https://app-{i}.example.com" for i in range(20)]
+    matcher = OriginMatcher(origins + ["https://*.preview.example.com"])
+    yield "OriginMatcher [exact]", lambda: matcher("https://app-7.example.com")
+    yield (
+        "OriginMatcher [pattern]",
+        lambda: matcher("https://pr-1.preview.example.com"),
+    )
+    yield "OriginMatcher [no match]", lambda: matcher("https://evil.com")
+
+
+def preflights_per_hour(call_interval: float, max_age: float) -> int:
+    """Preflights a browser sends for one endpoint called every
+    ``call_interval`` seconds, given the preflight cache lifetime."""
+    calls = math.ceil(3600 / call_interval)
+    if max_age <= call_interval:
+        return calls
+    return math.ceil(3600 / (math.ceil(max_age / call_interval) * call_interval))
+
+
+def print_volume() -> None:
+    max_age = min(settings.CORS_MAX_AGE, BROWSER_MAX_AGE_CAP)
+    print(f"Preflights per endpoint per hour (max-age {max_age}s vs none)")
+    for interval in (1, 10, 60):
+        before = preflights_per_hour(interval, BROWSER_DEFAULT_MAX_AGE)
+        after = preflights_per_hour(interval, max_age)
+        print(f"  one call every {interval:>2}s: {before:>5} -> {after}")
+    print()
+
+
+def cases() -> Iterator[Case]:
+    yield from request_cases()
+    yield from matcher_cases()
+
+
+if __name__ == "__main__":
+    print_volume()
+    main("cors", cases())
@@ -0,0 +1,106 @@
+"""Timing, JSON results and regression checks shared by the benchmarks.
+
+Each benchmark module builds a list of ``(name, func)`` cases and hands
+them to ``main()``, which times them and, on request, writes the results
+as JSON and compares them with a previous run::
+
+    python -m benchmarks.security --output baseline.json
+    python -m benchmarks.security --compare baseline.json --threshold 0.1
+
+``--compare`` exits with status 1 when any case got slower than the
+baseline by more than the threshold (a fraction, 0.1 = 10%).
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import timeit
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+Case = Tuple[str, Callable[[], object]]
+
+
+def measure(func: Callable[[], object], repeat: int = 5) -> Dict[str, float]:
+    """Time ``func`` per call, calibrating the loop count to ~0.2s per repeat."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    timings = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "min_us": min(timings) * 1e6,
+        "median_us": statistics.median(timings) * 1e6,
+        "number": number,
+    }
+
+
+def run(cases: Iterable[Case], pattern: Optional[str] = None) -> Dict[str, Dict]:
+    results = {}
+    for name, func in cases:
+        if pattern and pattern not in name:
+            continue
+        results[name] = measure(func)
+        print(f"{name:<55} {results[name]['min_us']:12.2f} us/op", flush=True)
+    return results
+
+
+def save(path: str, suite: str, results: Dict[str, Dict]) -> None:
+    document = {
+        "suite": suite,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+
+
+def compare(
+    baseline: Dict[str, Dict], current: Dict[str, Dict], threshold: float
+) -> List[str]:
+    """Print the change per case and return the names that regressed."""
+    regressions = []
+    for name, result in current.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        change = result["min_us"] / before["min_us"] - 1
+        regressed = change > threshold
+        if regressed:
+            regressions.append(name)
+        print(
+            f"{name:<55} {before['min_us']:12.2f} -> {result['min_us']:12.2f} us/op "
+            f"{change:+8.1%}{'  REGRESSION' if regressed else ''}"
+        )
+    return regressions
+
+
+def main(suite: str, cases: Iterable[Case], argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog=f"python -m benchmarks.{suite}")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="JSON results of a previous run")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="slowdown counted as a regression (default: 0.1 = 10%%)",
+    )
+    parser.add_argument("-k", dest="pattern", help="only run cases containing this")
+    args = parser.parse_args(argv)
+
+    results = run(cases, args.pattern)
+    if args.output:
+        save(args.output, suite, results)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        print()
+        regressions = compare(baseline, results, args.threshold)
+        if regressions:
+            print(
+                f"\n{len(regressions)} case(s) regressed by more than "
+                f"{args.threshold:.0%}"
+            )
+            sys.exit(1)
@@ -0,0 +1,83 @@
+"""Micro-benchmark of per-request logging overhead on the calling thread.
+
+Compares the previous synchronous stdlib logging (f-string message, a
+``StreamHandler`` writing on the request thread) with the structlog queue
+pipeline from ``src.core.log``, including an event dropped by sampling.
+Run with ``python -m benchmarks.logging_overhead``; see
+``benchmarks.harness`` for saving and comparing results.
+"""
+import logging
+import os
+from typing import Iterator
+
+from benchmarks.harness import Case, main
+from src.core import log
+from src.core.log import configure_logging, get_logger, shutdown_logging
+
+USER_ID = "0b5d1c9e-8f5e-4c47-9a53-6d1f0c1c6a11"
+# Large enough that the listener falling behind during a case doesn't make
+# the queued cases drop (and so skip) events
+QUEUE_SIZE = 1_000_000
+
+
+def _raise_and_log(emit):
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        emit()
+
+
+def stdlib_cases(devnull) -> Iterator[Case]:
+    # Baseline: synchronous stdlib handler on the calling thread
+    root = logging.getLogger()
+    handler = logging.StreamHandler(devnull)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+    root.handlers = [handler]
+    root.setLevel(logging.INFO)
+    yield (
+        "stdlib info [sync]",
+        lambda: logging.info(f"User {USER_ID} logged in"),
+    )
+    yield (
+        "stdlib error + traceback [sync]",
+        lambda: _raise_and_log(
+            lambda: logging.error("Unhandled error: boom", exc_info=True)
+        ),
+    )
+
+
+def queued_cases(devnull) -> Iterator[Case]:
+    logger = get_logger("benchmark")
+    cases = {
+        "structlog info [queued]": lambda: logger.info(
+            "login_succeeded", user_id=USER_ID
+        ),
+        "structlog exception [queued]": lambda: _raise_and_log(
+            lambda: logger.exception("unhandled_error")
+        ),
+        "structlog info [sampled out]": lambda: logger.info(
+            "login_sampled_out", user_id=USER_ID
+        ),
+    }
+    for name, func in cases.items():
+        # A fresh pipeline per case, so no case pays for the backlog the
+        # listener still has to write from the previous one
+        configure_logging(
+            sample_rates={"login_sampled_out": 0.0},
+            queue_size=QUEUE_SIZE,
+            stream=devnull,
+        )
+        yield name, func
+    shutdown_logging()
+    if log.dropped_events:
+        print(f"warning: {log.dropped_events} events dropped, timings are low")
+
+
+def cases() -> Iterator[Case]:
+    with open(os.devnull, "w") as devnull:
+        yield from stdlib_cases(devnull)
+        yield from queued_cases(devnull)
+
+
+if __name__ == "__main__":
+    main("logging_overhead", cases())
@@ -0,0 +1,66 @@
+"""Micro-benchmark of the login/refresh token response path.
+
+Compares the previous ``jsonify(TokenResponse(...).dict())`` path through
+Flask's stdlib JSON provider with ``model_response`` on the orjson
+provider. Run with ``python -m benchmarks.responses``; see
+``benchmarks.harness`` for saving and comparing results.
+"""
+import warnings
+from typing import Iterator
+
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+
+from benchmarks.harness import Case, main
+from src.core.serialization import init_json, model_response
+from src.schemas.auth import TokenResponse
+
+# Tokens of realistic size (HS256 access/refresh JWTs are ~200 chars)
+ACCESS_TOKEN = "a" * 220
+REFRESH_TOKEN = "r" * 220
+
+
+def stdlib_token_response():
+    return jsonify(
+        TokenResponse(
+            access_token=ACCESS_TOKEN,
+            refresh_token=REFRESH_TOKEN,
+            token_type="bearer",
+        ).dict()
+    )
+
+
+def orjson_token_response():
+    return model_response(
+        TokenResponse(
+            access_token=ACCESS_TOKEN,
+            refresh_token=REFRESH_TOKEN,
+            token_type="bearer",
+        )
+    )
+
+
+def error_response(app):
+    return app.json.response({"error": "Invalid email or password"})
+
+
+def cases() -> Iterator[Case]:
+    # .dict() is deprecated in pydantic 2; it is what the old path called
+    warnings.simplefilter("ignore", DeprecationWarning)
+    stdlib_app = Flask("stdlib")
+    stdlib_app.json = DefaultJSONProvider(stdlib_app)
+    orjson_app = Flask("orjson")
+    init_json(orjson_app)
+
+    # A generator: each app's context stays pushed while the harness times
+    # the cases yielded inside its block
+    with stdlib_app.app_context():
+        yield "token response [jsonify + .dict()]", stdlib_token_response
+        yield "error response [stdlib]", lambda: error_response(stdlib_app)
+    with orjson_app.app_context():
+        yield "token response [model_response]", orjson_token_response
+        yield "error response [orjson]", lambda: error_response(orjson_app)
+
+
+if __name__ == "__main__":
+    main("responses", cases())
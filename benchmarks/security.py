@@ -0,0 +1,203 @@
+"""Micro-benchmarks of the security primitives and the auth request overhead.
+
+Covers ``src.core.security`` token creation and decoding for HS256, RS256
+and EdDSA and for growing claim sets, bcrypt hashing and verification
+across cost factors, the ``AuthService`` constructor, and the ``deps``
+decorator stack of a protected view with a stubbed database session.
+Run with ``python -m benchmarks.security``; see ``benchmarks.harness``
+for saving and comparing results.
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterator
+from uuid import uuid4
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from flask import Flask
+from flask_jwt_extended import JWTManager
+
+from benchmarks.harness import Case, main
+from src.api.v1 import deps
+from src.config.settings import settings
+from src.core import security
+from src.core.keys import get_key_ring, init_jwt_keys
+from src.models.user import RoleType, User
+from src.services.auth import AuthService
+
+USER_ID = uuid4()
+PASSWORD = "correct horse battery staple"
+BCRYPT_ROUNDS = [4, 10, 12, 13]
+# Number of extra scope claims, roughly 0, 1 and 8 KB of payload
+CLAIM_SIZES = [0, 64, 512]
+
+
+def _pem(private_key) -> str:
+    return private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+
+
+KEYS = {
+    "HS256": [],
+    "RS256": [
+        {
+            "kid": "bench-rs256",
+            "private_key": _pem(rsa.generate_private_key(65537, 2048)),
+        }
+    ],
+    "EdDSA": [
+        {
+            "kid": "bench-eddsa",
+            "private_key": _pem(ed25519.Ed25519PrivateKey.generate()),
+        }
+    ],
+}
+
+
+@contextmanager
+def signing_with(algorithm: str) -> Iterator[None]:
+    """Sign with the given algorithm by swapping the configured key ring."""
+    original = settings.JWT_KEYS
+    settings.JWT_KEYS = KEYS[algorithm]
+    get_key_ring.cache_clear()
+    try:
+        yield
+    finally:
+        settings.JWT_KEYS = original
+        get_key_ring.cache_clear()
+
+
+def _token_with_scopes(scopes: int) -> str:
+    now = datetime.utcnow()
+    claims = {
+        "exp": now + timedelta(minutes=30),
+        "iat": now,
+        "jti": uuid4().hex,
+        "sub": str(USER_ID),
+        "type": "access",
+        "scopes": [f"service-{i}:read" for i in range(scopes)],
+    }
+    key_ring = get_key_ring()
+    if key_ring is None:
+        return jwt.encode(
+            claims, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM
+        )
+    key = key_ring.signing_key(now)
+    return jwt.encode(
+        claims, key.private_key, algorithm=key.algorithm, headers={"kid": key.kid}
+    )
+
+
+def token_cases() -> Iterator[Case]:
+    # A generator: each algorithm's key ring stays configured while the
+    # harness times the cases yielded inside its block
+    for algorithm in KEYS:
+        with signing_with(algorithm):
+            yield (
+                f"create_access_token [{algorithm}]",
+                lambda: security.create_access_token(USER_ID),
+            )
+            yield (
+                f"create_refresh_token [{algorithm}]",
+                lambda: security.create_refresh_token(USER_ID),
+            )
+            for size in CLAIM_SIZES:
+                token = _token_with_scopes(size)
+                yield (
+                    f"decode_token [{algorithm}, {size} scopes]",
+                    lambda token=token: security.decode_token(token),
+                )
+
+
+def password_cases() -> Iterator[Case]:
+    original = security.pwd_context
+    for rounds in BCRYPT_ROUNDS:
+        context = original.copy(bcrypt__rounds=rounds)
+        hashed = context.hash(PASSWORD)
+        security.pwd_context = context
+        try:
+            yield (
+                f"get_password_hash [bcrypt {rounds} rounds]",
+                lambda: security.get_password_hash(PASSWORD),
+            )
+        finally:
+            security.pwd_context = original
+        # Verification cost follows the rounds stored in the hash
+        yield (
+            f"verify_password [bcrypt {rounds} rounds]",
+            lambda hashed=hashed: security.verify_password(PASSWORD, hashed),
+        )
+
+
+class StubSession:
+    """Answers the user lookup of ``get_current_user`` without a database."""
+
+    def __init__(self, user: User):
+        self.user = user
+
+    def query(self, *entities):
+        return self
+
+    def filter(self, *criteria):
+        return self
+
+    def first(self):
+        return self.user
+
+
+def _view():
+    return {"message": "ok"}
+
+
+def request_cases() -> Iterator[Case]:
+    app = Flask(__name__)
+    app.config.from_object(settings)
+    init_jwt_keys(app, JWTManager(app))
+
+    user = User(
+        id=USER_ID,
+        email="bench@example.com",
+        role=RoleType.ADMIN,
+        updated_at=datetime.utcnow(),
+    )
+    session = StubSession(user)
+    headers = {"Authorization": f"Bearer {security.create_access_token(USER_ID)}"}
+
+    views = {
+        "request context only": _view,
+        "login_required": deps.login_required()(_view),
+        "login_required + conditional_user_response": deps.login_required()(
+            deps.conditional_user_response()(_view)
+        ),
+        "admin_required + conditional_user_response": deps.admin_required()(
+            deps.conditional_user_response()(_view)
+        ),
+    }
+
+    original_get_db = deps.get_db
+    deps.get_db = lambda: session
+    try:
+        yield "AuthService() [stub session]", lambda: AuthService(session)
+        for name, view in views.items():
+
+            def call(view=view):
+                with app.test_request_context("/", headers=headers):
+                    return view()
+
+            yield f"deps stack [{name}]", call
+    finally:
+        deps.get_db = original_get_db
+
+
+def cases() -> Iterator[Case]:
+    yield from token_cases()
+    yield from password_cases()
+    yield from request_cases()
+
+
+if __name__ == "__main__":
+    main("security", cases())
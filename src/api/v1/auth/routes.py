@@ -1,9 +1,16 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from sqlalchemy.orm import Session
-import logging
 
 from src.core.database import get_db
+from src.core.serialization import model_response
+from src.core.log import get_logger
+from src.api.v1.deps import (
+    login_required,
+    get_current_user,
+    internal_service_required,
+)
+from src.api.v1.validation import parse_body
 from src.services.auth import AuthService
 from src.schemas.auth import (
     UserCreate,
@@ -12,6 +19,8 @@ from src.schemas.auth import (
     PasswordResetRequest,
     PasswordReset,
     RefreshTokenRequest,
+    TokenIntrospectionRequest,
+    TokenIntrospectionResponse,
 )
 from src.core.exceptions import (
     InvalidCredentialsError,
@@ -21,12 +30,13 @@ from src.core.exceptions import (
 )
 
 auth_bp = Blueprint("auth", __name__)
+logger = get_logger(__name__)
 
 
 @auth_bp.route("/register", methods=["POST"])
 def register():
     try:
-        data = UserCreate(**request.get_json())
+        data = parse_body(UserCreate)
         db = get_db()
         auth_service = AuthService(db)
         user = auth_service.register_user(email=data.email, password=data.password)
@@ -38,14 +48,11 @@ def register():
         )
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
-    except Exception as e:
-        logging.error(f"[Registration error]: {str(e)}", exc_info=True)
-        raise
 
 
 @auth_bp.route("/login", methods=["POST"])
 def login():
-    data = UserLogin(**request.get_json())
+    data = parse_body(UserLogin)
     db: Session = get_db()
     auth_service = AuthService(db)
 
@@ -53,60 +60,79 @@ def login():
         user, access_token, refresh_token = auth_service.authenticate_user(
             email=data.email, password=data.password
         )
-        return (
-            jsonify(
-                TokenResponse(
-                    access_token=access_token,
-                    refresh_token=refresh_token,
-                    token_type="bearer",
-                ).dict()
-            ),
-            200,
+        logger.info("login_succeeded", user_id=str(user.id))
+        return model_response(
+            TokenResponse(
+                access_token=access_token,
+                refresh_token=refresh_token,
+                token_type="bearer",
+            )
         )
     except InvalidCredentialsError as e:
+        logger.info("login_failed", reason=str(e))
         return jsonify({"error": str(e)}), 401
 
 
 @auth_bp.route("/refresh", methods=["POST"])
 def refresh():
-    data = RefreshTokenRequest(**request.get_json())
+    data = parse_body(RefreshTokenRequest)
     db: Session = get_db()
     auth_service = AuthService(db)
 
     try:
         access_token, refresh_token = auth_service.refresh_tokens(data.refresh_token)
-        return (
-            jsonify(
-                TokenResponse(
-                    access_token=access_token,
-                    refresh_token=refresh_token,
-                    token_type="bearer",
-                ).dict()
-            ),
-            200,
+        logger.info("token_refreshed")
+        return model_response(
+            TokenResponse(
+                access_token=access_token,
+                refresh_token=refresh_token,
+                token_type="bearer",
+            )
         )
     except (TokenExpiredError, TokenInvalidError) as e:
         return jsonify({"error": str(e)}), 401
 
 
+@auth_bp.route("/logout-all", methods=["POST"])
+@login_required()
+def logout_all():
+    db: Session = get_db()
+    auth_service = AuthService(db)
+
+    user = get_current_user()
+    revoked = auth_service.logout_all(user.id)
+    return jsonify({"message": "Logged out from all sessions", "revoked": revoked}), 200
+
+
+@auth_bp.route("/introspect", methods=["POST"])
+@internal_service_required()
+def introspect():
+    data = parse_body(TokenIntrospectionRequest)
+    db: Session = get_db()
+    auth_service = AuthService(db)
+
+    results = auth_service.introspect_tokens(data.tokens)
+    return model_response(TokenIntrospectionResponse(results=results))
+
+
 @auth_bp.route("/forgot-password", methods=["POST"])
 def forgot_password():
-    data = PasswordResetRequest(**request.get_json())
+    data = parse_body(PasswordResetRequest)
     db: Session = get_db()
     auth_service = AuthService(db)
 
     try:
-        token = auth_service.create_password_reset_token(data.email)
-        # In a real application, you would send this token via email
-        # For development, we'll just return it
-        return jsonify({"message": "Password reset token created", "token": token}), 200
+        # The token only goes out by email; returning it would let anyone
+        # who knows the address reset the password
+        auth_service.create_password_reset_token(data.email)
+        return jsonify({"message": "Password reset email sent"}), 200
     except UserNotFoundError as e:
         return jsonify({"error": str(e)}), 404
 
 
 @auth_bp.route("/reset-password", methods=["POST"])
 def reset_password():
-    data = PasswordReset(**request.get_json())
+    data = parse_body(PasswordReset)
     db: Session = get_db()
     auth_service = AuthService(db)
 
@@ -137,15 +163,12 @@ async def oauth_callback(provider):
         user, access_token, refresh_token = await auth_service.authenticate_oauth(
             provider, token
         )
-        return (
-            jsonify(
-                TokenResponse(
-                    access_token=access_token,
-                    refresh_token=refresh_token,
-                    token_type="bearer",
-                ).dict()
-            ),
-            200,
+        return model_response(
+            TokenResponse(
+                access_token=access_token,
+                refresh_token=refresh_token,
+                token_type="bearer",
+            )
         )
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
@@ -1,23 +1,93 @@
+import hashlib
+import hmac
 from functools import wraps
-from flask import jsonify, request
+import sqlalchemy as sa
+from flask import current_app, g, jsonify, make_response, request
 from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from prometheus_client import Counter
 from sqlalchemy.orm import Session
-from typing import List, Union
-
-from src.core.database import get_db
+from typing import Any, Dict, List, Optional, Union
+from uuid import UUID
+
+from src.config.settings import settings
+from src.core.cache import MemoryCache
+from src.core.database import (
+    get_db,
+    has_replicas,
+    read_replica,
+    record_database_error,
+)
+from src.core.exceptions import ServiceUnavailableError
 from src.models.user import User, RoleType
 
+DEGRADED_AUTH = Counter(
+    "auth_degraded_requests_total",
+    "Requests authorized from cached user data while the database was down",
+)
+
+DATABASE_ERRORS = (
+    ServiceUnavailableError,
+    sa.exc.OperationalError,
+    sa.exc.TimeoutError,
+)
+
+# Users loaded recently, to authorize from while the database is down
+_user_snapshots = MemoryCache()
+
+
+def _snapshot(user: User) -> Dict[str, Any]:
+    return {
+        "id": user.id,
+        "email": user.email,
+        "role": user.role,
+        "is_active": user.is_active,
+        "is_verified": user.is_verified,
+        "updated_at": user.updated_at,
+    }
+
 
 def get_current_user():
+    # Stacked decorators and views all ask for the user; load it once
+    if "current_user" in g:
+        return g.current_user
+
     verify_jwt_in_request()
     user_id = get_jwt_identity()
     db: Session = get_db()
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        return None
+    try:
+        with read_replica(user_id):
+            user = db.query(User).filter(User.id == UUID(user_id)).first()
+        if user is None and has_replicas():
+            # The account may be newer than what the replica has replayed
+            user = db.query(User).filter(User.id == UUID(user_id)).first()
+    except DATABASE_ERRORS as e:
+        user = _degraded_user(user_id, e)
+    else:
+        if user is not None:
+            _user_snapshots.set(
+                user_id, _snapshot(user), settings.AUTH_DEGRADED_MAX_STALENESS_SECONDS
+            )
+    g.current_user = user
     return user
 
 
+def _degraded_user(user_id: str, error: Exception) -> User:
+    """Rebuild the user from its snapshot when the database is unavailable.
+
+    The snapshot expires after ``AUTH_DEGRADED_MAX_STALENESS_SECONDS``;
+    without one the request fails with 503. The returned user is detached,
+    so views that need more than the user itself still fail.
+    """
+    if not isinstance(error, ServiceUnavailableError):
+        record_database_error(error)
+    snapshot = _user_snapshots.get(user_id)
+    if snapshot is None:
+        raise ServiceUnavailableError("database is unavailable") from error
+    DEGRADED_AUTH.inc()
+    g.auth_degraded = True
+    return User(**snapshot)
+
+
 def login_required():
     def decorator(func):
         @wraps(func)
@@ -83,3 +153,67 @@ def guest_not_allowed():
         return wrapped
 
     return decorator
+
+
+def user_etag(user: User) -> str:
+    """Strong ETag for per-user responses; changes whenever the user row does"""
+    version = f"{request.endpoint}:{user.id}:{user.updated_at.isoformat()}"
+    return hashlib.sha256(version.encode()).hexdigest()[:32]
+
+
+def conditional_user_response(max_age: Optional[int] = None):
+    """Cache per-user read endpoints on the client.
+
+    Responses get a strong ETag derived from the current user and
+    ``Cache-Control: private``. A matching ``If-None-Match`` is answered
+    with 304 before the view runs, so nothing is computed or serialized.
+    Apply below ``login_required()`` or a role decorator.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapped(*args, **kwargs):
+            user = get_current_user()
+            etag = user_etag(user)
+            # If-None-Match compares weakly (RFC 9110 13.1.2), e.g. after a
+            # proxy that compresses responses weakened the ETag
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(func(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            response.cache_control.private = True
+            response.cache_control.max_age = (
+                settings.PROTECTED_CACHE_MAX_AGE if max_age is None else max_age
+            )
+            response.vary.add("Authorization")
+            return response
+
+        return wrapped
+
+    return decorator
+
+
+def internal_service_required():
+    """Allow only callers presenting one of the configured internal API keys"""
+
+    def decorator(func):
+        @wraps(func)
+        def wrapped(*args, **kwargs):
+            api_key = request.headers.get("X-Internal-API-Key", "").encode()
+            if not any(
+                hmac.compare_digest(api_key, key.encode())
+                for key in settings.INTERNAL_API_KEYS
+            ):
+                return (
+                    jsonify({"error": "Internal service authentication required"}),
+                    401,
+                )
+            return func(*args, **kwargs)
+
+        return wrapped
+
+    return decorator
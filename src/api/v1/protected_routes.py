@@ -4,21 +4,35 @@ from src.api.v1.deps import (
     admin_required,
     role_required,
     guest_not_allowed,
+    conditional_user_response,
+    get_current_user,
 )
+from src.core.serialization import model_response
 from src.models.user import RoleType
+from src.schemas.auth import UserInfo
 
 protected_bp = Blueprint("protected", __name__)
 
 
 @protected_bp.route("/user-info")
 @login_required()
+@conditional_user_response()
 def get_user_info():
     """Endpoint accessible by any authenticated user"""
-    return jsonify({"message": "You are authenticated!"})
+    user = get_current_user()
+    return model_response(
+        UserInfo(
+            id=str(user.id),
+            email=user.email,
+            role=user.role.value,
+            is_verified=bool(user.is_verified),
+        )
+    )
 
 
 @protected_bp.route("/admin-only")
 @admin_required()
+@conditional_user_response()
 def admin_only():
     """Endpoint accessible only by admins"""
     return jsonify({"message": "Welcome, admin!"})
@@ -26,6 +40,7 @@ def admin_only():
 
 @protected_bp.route("/user-and-admin")
 @role_required([RoleType.USER, RoleType.ADMIN])
+@conditional_user_response()
 def user_and_admin():
     """Endpoint accessible by both users and admins, but not guests"""
     return jsonify({"message": "Welcome, user or admin!"})
@@ -33,6 +48,7 @@ def user_and_admin():
 
 @protected_bp.route("/no-guests")
 @guest_not_allowed()
+@conditional_user_response()
 def no_guests():
     """Endpoint not accessible by guests"""
     return jsonify({"message": "Welcome, non-guest user!"})
@@ -0,0 +1,21 @@
+from flask import Blueprint, jsonify
+from sqlalchemy.orm import Session
+
+from src.api.v1.deps import internal_service_required
+from src.api.v1.validation import parse_body
+from src.core.database import get_db
+from src.schemas.auth import UserBatchRequest
+from src.services.users import UserService
+
+users_bp = Blueprint("users", __name__)
+
+
+@users_bp.route("/batch", methods=["POST"])
+@internal_service_required()
+def batch_users():
+    """Resolve up to USER_BATCH_MAX_IDS user ids for internal services"""
+    data = parse_body(UserBatchRequest)
+    db: Session = get_db()
+
+    users, not_found = UserService(db).get_users(data.ids)
+    return jsonify({"users": users, "not_found": not_found})
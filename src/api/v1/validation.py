@@ -0,0 +1,31 @@
+from functools import lru_cache
+from typing import Any, Type, TypeVar
+
+from flask import request
+from pydantic import TypeAdapter, ValidationError
+
+from src.core.exceptions import RequestValidationError
+
+T = TypeVar("T")
+
+
+@lru_cache(maxsize=None)
+def get_type_adapter(schema: Type[Any]) -> TypeAdapter:
+    """Build the validator for a schema once per process instead of per request."""
+    return TypeAdapter(schema)
+
+
+def parse_body(schema: Type[T]) -> T:
+    """Validate the raw request body against ``schema``.
+
+    The body is parsed and validated in one pass by pydantic-core, so
+    malformed JSON, a missing body and invalid fields all surface as a
+    ``RequestValidationError`` (422) instead of a ``TypeError`` or
+    ``ValidationError`` escaping to the generic 500 handler.
+    """
+    try:
+        return get_type_adapter(schema).validate_json(request.get_data(cache=True))
+    except ValidationError as e:
+        raise RequestValidationError(
+            e.errors(include_url=False, include_context=False, include_input=False)
+        )
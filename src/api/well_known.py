@@ -0,0 +1,21 @@
+from flask import Blueprint, current_app, jsonify, request
+
+from src.config.settings import settings
+from src.core.keys import get_key_ring
+
+well_known_bp = Blueprint("well_known", __name__)
+
+
+@well_known_bp.route("/jwks.json")
+def jwks():
+    """Public signing keys, for services verifying our tokens locally"""
+    key_ring = get_key_ring()
+    if key_ring is None:
+        return jsonify({"keys": []})
+
+    body, etag = key_ring.jwks()
+    response = current_app.response_class(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = settings.JWKS_CACHE_MAX_AGE
+    return response.make_conditional(request)
@@ -1,30 +1,52 @@
+from typing import Any, Dict, Optional
+
 from flask import Flask
 from flask_jwt_extended import JWTManager
-from flask_cors import CORS
 from flask_migrate import Migrate
 
-from src.core.database import db
+from src.core.cors import init_cors
+from src.core.database import db, init_db
 from src.core.exceptions import register_error_handlers
+from src.core.serialization import init_json
+from src.core.log import init_logging
+from src.core.keys import init_jwt_keys
+from src.core.jobs import job_queue
+from src.core.metrics import init_metrics
+from src.core.profiling import init_profiling
+from src.services.audit import audit_log
 from src.api.v1.auth.routes import auth_bp
 from src.api.v1.protected_routes import protected_bp
+from src.api.v1.users import users_bp
+from src.api.well_known import well_known_bp
 from src.config.settings import settings
 
 
-def create_app():
+def create_app(test_config: Optional[Dict[str, Any]] = None):
     app = Flask(__name__)
+    init_json(app)
 
     # Configure app
     app.config.from_object(settings)
+    if test_config:
+        app.config.update(test_config)
+    init_logging(app)
+    init_profiling(app)
 
     # Initialize extensions
-    CORS(app)
-    db.init_app(app)
+    init_cors(app)
+    init_db(app)
     jwt = JWTManager(app)
+    init_jwt_keys(app, jwt)
     migrate = Migrate(app, db)
+    job_queue.init_app(app)
+    audit_log.init_app(app)
+    init_metrics(app)
 
     # Register blueprints
     app.register_blueprint(auth_bp, url_prefix="/api/v1/auth")
     app.register_blueprint(protected_bp, url_prefix="/api/v1/protected")
+    app.register_blueprint(users_bp, url_prefix="/api/v1/users")
+    app.register_blueprint(well_known_bp, url_prefix="/.well-known")
 
     # Register error handlers
     register_error_handlers(app)
@@ -1,9 +1,10 @@
 import os
 from datetime import timedelta
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import PostgresDsn, field_validator
 
+
 class Settings(BaseSettings):
     # Flask settings
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-super-secret-key")
@@ -14,6 +15,21 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Asymmetric signing keys (RS256/EdDSA); when empty tokens are signed
+    # with JWT_SECRET_KEY. Each entry: {"kid", "private_key_file" or
+    # "public_key_file", optional "alg", "not_before", "not_after"}
+    JWT_KEYS: List[Dict[str, Any]] = []
+    # Once JWT_KEYS is set, tokens without a kid (signed with the shared
+    # secret) are rejected. To keep them valid while moving to JWT_KEYS,
+    # set this to the ISO 8601 time up to which they are still accepted
+    JWT_ACCEPT_HS256_UNTIL: str = os.getenv("JWT_ACCEPT_HS256_UNTIL", "")
+    JWKS_CACHE_MAX_AGE: int = 3600
+    # Seconds during which a rotated refresh token still returns the pair
+    # it was exchanged for; later reuse revokes the whole token family
+    REFRESH_REUSE_WINDOW_SECONDS: int = 30
+    # Where those pairs are kept: "redis" (shared by all workers) or
+    # "memory", which only serves replays that reach the same process
+    REFRESH_REUSE_CACHE: str = os.getenv("REFRESH_REUSE_CACHE", "redis")
 
     # Database settings
     DB_USER: str = os.getenv("DB_USER", "postgres")
@@ -23,7 +39,7 @@ class Settings(BaseSettings):
     DB_NAME: str = os.getenv("DB_NAME", "postgres")
     DATABASE_URL: Optional[PostgresDsn] = None
 
-    @field_validator("DATABASE_URL", mode='before')
+    @field_validator("DATABASE_URL", mode="before")
     def assemble_db_connection(cls, v: Optional[str], info: Dict[str, Any]) -> Any:
         if isinstance(v, str):
             return v
@@ -32,25 +48,79 @@ class Settings(BaseSettings):
             username=info.data.get("DB_USER"),
             password=info.data.get("DB_PASSWORD"),
             host=info.data.get("DB_HOST"),
-            port=info.data.get("DB_PORT"),
+            port=int(info.data.get("DB_PORT")),
             path=f"/{info.data.get('DB_NAME') or ''}",
         )
 
+    # Fail fast instead of hanging workers when Postgres stalls
+    DB_POOL_TIMEOUT_SECONDS: float = 5.0
+    DB_CONNECT_TIMEOUT_SECONDS: int = 3
+    DB_STATEMENT_TIMEOUT_MS: int = 5000
+    # Consecutive database failures that open the circuit, and how long it
+    # stays open before a trial query is let through
+    DB_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    DB_CIRCUIT_RESET_SECONDS: float = 10.0
+    # While the circuit is open, protected endpoints authorize from user
+    # data cached at most this many seconds ago
+    AUTH_DEGRADED_MAX_STALENESS_SECONDS: int = 300
+
+    # Read replica settings (comma-separated URLs, empty to disable)
+    DATABASE_REPLICA_URLS: str = os.getenv("DATABASE_REPLICA_URLS", "")
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_LAG_CHECK_INTERVAL_SECONDS: float = 2.0
+    REPLICA_READ_YOUR_WRITES_SECONDS: float = 5.0
+
     # SQLAlchemy settings
     SQLALCHEMY_DATABASE_URI: Optional[str] = None
+    SQLALCHEMY_BINDS: Dict[str, str] = {}
     SQLALCHEMY_TRACK_MODIFICATIONS: bool = False
 
-    @field_validator("SQLALCHEMY_DATABASE_URI", mode='before')
+    @field_validator("SQLALCHEMY_DATABASE_URI", mode="before")
     def assemble_db_uri(cls, v: Optional[str], info: Dict[str, Any]) -> Any:
         if isinstance(v, str):
             return v
         return str(info.data.get("DATABASE_URL"))
 
+    @field_validator("SQLALCHEMY_BINDS", mode="before")
+    def assemble_replica_binds(
+        cls, v: Optional[Dict[str, str]], info: Dict[str, Any]
+    ) -> Any:
+        if v:
+            return v
+        urls = info.data.get("DATABASE_REPLICA_URLS") or ""
+        return {
+            f"replica_{i}": url.strip()
+            for i, url in enumerate(urls.split(","))
+            if url.strip()
+        }
+
     # Redis settings
     REDIS_HOST: str = os.getenv("REDIS_HOST", "localhost")
     REDIS_PORT: int = int(os.getenv("REDIS_PORT", 6379))
     REDIS_URL: str = os.getenv("REDIS_URL", f"redis://{REDIS_HOST}:{REDIS_PORT}/0")
 
+    # Background job settings
+    # Run jobs inline instead of enqueueing them (tests, development)
+    JOBS_EAGER: bool = False
+    JOBS_MAX_ATTEMPTS: int = 5
+    # Base delay of the exponential retry backoff
+    JOBS_RETRY_BACKOFF_SECONDS: float = 2.0
+    # Port `flask worker` serves Prometheus metrics on (0 to disable)
+    JOBS_METRICS_PORT: int = 0
+
+    # Mail settings
+    # "smtp" or "memory" (keeps messages in memory, for tests)
+    MAIL_BACKEND: str = os.getenv("MAIL_BACKEND", "smtp")
+    MAIL_HOST: str = os.getenv("MAIL_HOST", "localhost")
+    MAIL_PORT: int = int(os.getenv("MAIL_PORT", 1025))
+    MAIL_USERNAME: str = os.getenv("MAIL_USERNAME", "")
+    MAIL_PASSWORD: str = os.getenv("MAIL_PASSWORD", "")
+    MAIL_USE_TLS: bool = False
+    MAIL_FROM: str = os.getenv("MAIL_FROM", "no-reply@localhost")
+    PASSWORD_RESET_URL: str = os.getenv(
+        "PASSWORD_RESET_URL", "http://localhost:3000/reset-password?token={token}"
+    )
+
     # OAuth settings
     GOOGLE_CLIENT_ID: str = os.getenv("GOOGLE_CLIENT_ID", "")
     GOOGLE_CLIENT_SECRET: str = os.getenv("GOOGLE_CLIENT_SECRET", "")
@@ -64,14 +134,67 @@ class Settings(BaseSettings):
         "GITHUB_REDIRECT_URI", "http://localhost:5000/api/v1/auth/oauth/github/callback"
     )
 
-    # CORS settings
+    # CORS settings; origins may use * for part of the host name, e.g.
+    # "https://*.example.com"
     CORS_ORIGINS: list = ["*"]
     CORS_METHODS: list = ["*"]
     CORS_ALLOWED_HEADERS: list = ["*"]
+    # Seconds browsers may reuse a preflight answer (Chromium caps it at 7200)
+    CORS_MAX_AGE: int = 86400
 
     # Security settings
     BCRYPT_LOG_ROUNDS: int = 13
 
+    # Client-side cache lifetime (seconds) of per-user read endpoints;
+    # clients revalidate with If-None-Match afterwards
+    PROTECTED_CACHE_MAX_AGE: int = 0
+
+    # Internal service settings
+    # Keys accepted in the X-Internal-API-Key header of internal endpoints
+    INTERNAL_API_KEYS: List[str] = []
+    INTROSPECTION_MAX_TOKENS: int = 100
+    USER_BATCH_MAX_IDS: int = 100
+    # User records served to internal services are cached per process and,
+    # with USER_CACHE_BACKEND=redis, in Redis for all workers. Changes are
+    # invalidated in both, but other workers keep their local copy for up
+    # to USER_CACHE_LOCAL_TTL_SECONDS
+    USER_CACHE_BACKEND: str = os.getenv("USER_CACHE_BACKEND", "memory")
+    USER_CACHE_TTL_SECONDS: int = 300
+    USER_CACHE_LOCAL_TTL_SECONDS: int = 5
+    USER_CACHE_MAX_ENTRIES: int = 10000
+
+    # Audit log settings
+    AUDIT_ENABLED: bool = True
+    # Events held in memory at most; further events are dropped
+    AUDIT_BUFFER_SIZE: int = 10000
+    # Flush when this many events are waiting, or every interval
+    AUDIT_FLUSH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+
+    # Logging settings
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    # Per-logger level overrides, e.g. {"sqlalchemy.engine": "WARNING"}
+    LOG_LEVELS: Dict[str, str] = {}
+    # Fraction of high-volume events to keep, keyed by event name
+    LOG_SAMPLE_RATES: Dict[str, float] = {
+        "login_succeeded": 0.1,
+        "token_refreshed": 0.1,
+    }
+    LOG_QUEUE_SIZE: int = 10000
+
+    # Profiling settings
+    # Profile requests with a signed X-Profile header (`flask profile-token`)
+    # or a random sample of them; nothing is hooked in when disabled
+    PROFILING_ENABLED: bool = False
+    PROFILING_SECRET: str = os.getenv("PROFILING_SECRET", "")
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_INTERVAL_MS: float = 1.0
+    PROFILING_DIR: str = os.getenv("PROFILING_DIR", "profiles")
+
+    # Metrics settings
+    # Serve Prometheus metrics on /metrics
+    METRICS_ENABLED: bool = False
+
     model_config = SettingsConfigDict(case_sensitive=True)
 
 
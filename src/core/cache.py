@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import redis
+
+
+class MemoryCache:
+    """In-process LRU cache with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Return the live entries among ``keys``; misses are left out."""
+        found = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    def set_many(self, values: Dict[str, Any], ttl: float) -> None:
+        for key, value in values.items():
+            self.set(key, value, ttl)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCache:
+    """Cache shared by all processes, with keys under ``namespace``."""
+
+    def __init__(self, url: str, namespace: str):
+        self.redis = redis.Redis.from_url(url)
+        self.namespace = namespace
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.redis.get(f"{self.namespace}:{key}")
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.redis.set(f"{self.namespace}:{key}", value, px=int(ttl * 1000))
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        """Fetch ``keys`` in one round trip; misses are left out."""
+        keys = list(keys)
+        if not keys:
+            return {}
+        values = self.redis.mget([f"{self.namespace}:{key}" for key in keys])
+        return {key: value for key, value in zip(keys, values) if value is not None}
+
+    def set_many(self, values: Dict[str, bytes], ttl: float) -> None:
+        pipeline = self.redis.pipeline(transaction=False)
+        for key, value in values.items():
+            pipeline.set(f"{self.namespace}:{key}", value, px=int(ttl * 1000))
+        pipeline.execute()
+
+    def delete(self, key: str) -> None:
+        self.redis.delete(f"{self.namespace}:{key}")
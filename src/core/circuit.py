@@ -0,0 +1,90 @@
+import threading
+import time
+
+from prometheus_client import Counter, Gauge
+
+from src.core.exceptions import ServiceUnavailableError
+from src.core.log import get_logger
+
+logger = get_logger(__name__)
+
+CIRCUIT_STATE = Gauge(
+    "circuit_breaker_state", "0 = closed, 1 = half-open, 2 = open", ["circuit"]
+)
+CIRCUIT_TRIPS = Counter(
+    "circuit_breaker_trips_total", "Times a circuit opened", ["circuit"]
+)
+CIRCUIT_REJECTED = Counter(
+    "circuit_breaker_rejected_total",
+    "Calls failed fast by an open circuit",
+    ["circuit"],
+)
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """Fails calls fast once a dependency keeps failing.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    ``check()`` raises immediately. After ``reset_timeout`` seconds one
+    trial call is let through (half-open): its success closes the circuit,
+    its failure opens it again.
+    """
+
+    def __init__(
+        self, name: str, failure_threshold: int = 5, reset_timeout: float = 10.0
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+        CIRCUIT_STATE.labels(name).set(0)
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        with self._lock:
+            # Also retries when a trial call never reported back
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._set_state(HALF_OPEN)
+                self._opened_at = time.monotonic()
+                return True
+            return False
+
+    def check(self) -> None:
+        if not self.allow():
+            CIRCUIT_REJECTED.labels(self.name).inc()
+            raise ServiceUnavailableError(f"{self.name} is unavailable")
+
+    def record_success(self) -> None:
+        if self.state == CLOSED and not self._failures:
+            return
+        with self._lock:
+            self._failures = 0
+            if self.state != CLOSED:
+                self._set_state(CLOSED)
+                logger.warning("circuit_closed", circuit=self.name)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == HALF_OPEN or (
+                self.state == CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._set_state(OPEN)
+                self._opened_at = time.monotonic()
+                CIRCUIT_TRIPS.labels(self.name).inc()
+                logger.error(
+                    "circuit_opened", circuit=self.name, failures=self._failures
+                )
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        CIRCUIT_STATE.labels(self.name).set(_STATE_VALUES[state])
@@ -0,0 +1,144 @@
+import re
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from flask import Flask
+from prometheus_client import Counter
+
+CORS_PREFLIGHTS = Counter(
+    "cors_preflights_total", "CORS preflight requests answered", ["allowed"]
+)
+
+Headers = List[Tuple[str, str]]
+
+
+class OriginMatcher:
+    """Matches request origins against the configured allow-list.
+
+    Entries are exact origins, ``*`` for any origin, or patterns with ``*``
+    standing for part of a host name (``https://*.example.com``). Exact
+    origins are a set lookup; the patterns are compiled into one regex.
+    """
+
+    def __init__(self, origins: Iterable[str]):
+        origins = [origin.rstrip("/") for origin in origins]
+        self.any = "*" in origins
+        self.exact = frozenset(origin for origin in origins if "*" not in origin)
+        patterns = [
+            re.escape(origin).replace(r"\*", r"[A-Za-z0-9.-]*")
+            for origin in origins
+            if "*" in origin and origin != "*"
+        ]
+        self.pattern = re.compile("|".join(patterns)) if patterns else None
+
+    def __call__(self, origin: str) -> bool:
+        return (
+            self.any
+            or origin in self.exact
+            or (self.pattern is not None and self.pattern.fullmatch(origin) is not None)
+        )
+
+
+class CORSMiddleware:
+    """WSGI middleware adding CORS headers and answering preflights.
+
+    Preflights are answered here, before Flask builds a request context,
+    so they never reach blueprint dispatch, request hooks or the auth
+    decorators. ``max_age`` lets browsers reuse a preflight answer for
+    that many seconds instead of sending one before every call.
+    """
+
+    def __init__(
+        self,
+        wsgi_app: Callable,
+        origins: Iterable[str],
+        methods: Iterable[str],
+        headers: Iterable[str],
+        max_age: int,
+    ):
+        self.wsgi_app = wsgi_app
+        self.origin_allowed = OriginMatcher(origins)
+        methods = [method.upper() for method in methods]
+        self.any_method = "*" in methods
+        self.allow_methods = ", ".join(methods)
+        headers = list(headers)
+        self.any_header = "*" in headers
+        self.allow_headers = ", ".join(headers)
+        self.max_age = str(max_age)
+        # Without an allow-list the response doesn't depend on the origin
+        self.reflect_origin = not self.origin_allowed.any
+
+    def __call__(self, environ, start_response):
+        origin = environ.get("HTTP_ORIGIN")
+        allowed = origin is not None and self.origin_allowed(origin)
+        if (
+            origin is not None
+            and environ["REQUEST_METHOD"] == "OPTIONS"
+            and "HTTP_ACCESS_CONTROL_REQUEST_METHOD" in environ
+        ):
+            CORS_PREFLIGHTS.labels("true" if allowed else "false").inc()
+            headers = self._preflight_headers(environ, origin, allowed)
+            start_response("204 No Content", headers)
+            return []
+
+        cors_headers = []
+        if allowed:
+            cors_headers.append(
+                ("Access-Control-Allow-Origin", self._allow_origin(origin))
+            )
+        if self.reflect_origin:
+            # Also without an allowed origin: a shared cache must not serve
+            # the response without CORS headers to an allowed one
+            cors_headers.append(("Vary", "Origin"))
+        if not cors_headers:
+            return self.wsgi_app(environ, start_response)
+
+        def cors_start_response(status, headers, exc_info=None):
+            headers.extend(cors_headers)
+            return start_response(status, headers, exc_info)
+
+        return self.wsgi_app(environ, cors_start_response)
+
+    def _allow_origin(self, origin: str) -> str:
+        return origin if self.reflect_origin else "*"
+
+    def _preflight_headers(self, environ, origin: str, allowed: bool) -> Headers:
+        headers = [
+            ("Content-Length", "0"),
+            (
+                "Vary",
+                "Origin, Access-Control-Request-Method, Access-Control-Request-Headers",
+            ),
+        ]
+        if not allowed:
+            return headers
+        requested_headers: Optional[str] = environ.get(
+            "HTTP_ACCESS_CONTROL_REQUEST_HEADERS"
+        )
+        headers.append(("Access-Control-Allow-Origin", self._allow_origin(origin)))
+        headers.append(
+            (
+                "Access-Control-Allow-Methods",
+                environ["HTTP_ACCESS_CONTROL_REQUEST_METHOD"]
+                if self.any_method
+                else self.allow_methods,
+            )
+        )
+        if requested_headers:
+            headers.append(
+                (
+                    "Access-Control-Allow-Headers",
+                    requested_headers if self.any_header else self.allow_headers,
+                )
+            )
+        headers.append(("Access-Control-Max-Age", self.max_age))
+        return headers
+
+
+def init_cors(app: Flask) -> None:
+    app.wsgi_app = CORSMiddleware(
+        app.wsgi_app,
+        origins=app.config["CORS_ORIGINS"],
+        methods=app.config["CORS_METHODS"],
+        headers=app.config["CORS_ALLOWED_HEADERS"],
+        max_age=app.config["CORS_MAX_AGE"],
+    )
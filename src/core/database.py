@@ -1,9 +1,278 @@
-from typing import Generator
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from itertools import chain
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import sqlalchemy as sa
+from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy import event, text
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import operators
+
+from src.core.circuit import CircuitBreaker
+from src.core.log import get_logger
+
+logger = get_logger(__name__)
+
+REPLICA_BIND_PREFIX = "replica_"
+
+# Seconds the replica is behind the primary; 0 when fully replayed and NULL
+# (treated as 0) on a server that isn't a streaming replica.
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+_replica_reads: ContextVar[bool] = ContextVar("replica_reads", default=False)
+
+# Opens when the primary keeps failing; session queries and flushes on the
+# primary then fail fast with ServiceUnavailableError instead of waiting on
+# the pool
+db_breaker = CircuitBreaker("database")
+
+
+class ReplicaMonitor:
+    """Tracks replica lag and the users that wrote recently.
+
+    Lag is sampled at most once per ``check_interval`` per replica. Recent
+    writes are kept per process, so read-your-writes holds for requests
+    served by the same worker.
+    """
+
+    def __init__(self):
+        self.max_lag = 5.0
+        self.check_interval = 2.0
+        self.read_your_writes_window = 5.0
+        self._health: Dict[str, Tuple[float, bool]] = {}
+        self._recent_writes: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app: Flask) -> None:
+        self.max_lag = app.config["REPLICA_MAX_LAG_SECONDS"]
+        self.check_interval = app.config["REPLICA_LAG_CHECK_INTERVAL_SECONDS"]
+        self.read_your_writes_window = app.config["REPLICA_READ_YOUR_WRITES_SECONDS"]
+
+    def is_healthy(self, key: str, engine: sa.Engine) -> bool:
+        now = time.monotonic()
+        checked = self._health.get(key)
+        if checked is not None and now - checked[0] < self.check_interval:
+            return checked[1]
+
+        try:
+            with engine.connect() as conn:
+                lag = conn.execute(REPLICA_LAG_QUERY).scalar()
+            healthy = (lag or 0) <= self.max_lag
+        except sa.exc.SQLAlchemyError:
+            healthy = False
+        self._health[key] = (now, healthy)
+        return healthy
+
+    def record_writes(self, user_ids) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for user_id in user_ids:
+                self._recent_writes[str(user_id)] = now
+            # Forget writes that are out of the window
+            cutoff = now - self.read_your_writes_window
+            for user_id, written_at in list(self._recent_writes.items()):
+                if written_at < cutoff:
+                    del self._recent_writes[user_id]
+
+    def wrote_recently(self, user_id: Any) -> bool:
+        written_at = self._recent_writes.get(str(user_id))
+        return (
+            written_at is not None
+            and time.monotonic() - written_at < self.read_your_writes_window
+        )
+
+
+replica_monitor = ReplicaMonitor()
+
+
+class RoutingSession(FlaskSession):
+    """Session that sends designated reads to a healthy replica.
+
+    Reads are routed only inside ``read_replica()`` and only for SELECTs
+    issued outside a flush in a transaction that hasn't written yet;
+    everything else goes to the primary. Only work on the primary goes
+    through ``db_breaker``, which hears back from the primary's engine
+    alone, so replica reads never become a half-open trial that can't
+    report its outcome.
+    """
+
+    def get_bind(
+        self,
+        mapper: Optional[Any] = None,
+        clause: Optional[Any] = None,
+        bind: Optional[Any] = None,
+        **kwargs: Any,
+    ):
+        if (
+            bind is None
+            and _replica_reads.get()
+            and isinstance(clause, sa.Select)
+            and not self._flushing
+            and not self._in_write_transaction()
+        ):
+            replica = self._pick_replica()
+            if replica is not None:
+                return replica
+        db_breaker.check()
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _in_write_transaction(self) -> bool:
+        return bool(self.info.get("wrote") or self.new or self.deleted or self.dirty)
+
+    def _pick_replica(self) -> Optional[sa.Engine]:
+        replicas = [
+            engine
+            for key, engine in self._db.engines.items()
+            if key
+            and key.startswith(REPLICA_BIND_PREFIX)
+            and replica_monitor.is_healthy(key, engine)
+        ]
+        return random.choice(replicas) if replicas else None
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _track_flushed_writes(session, flush_context):
+    session.info["wrote"] = True
+    owners = session.info.setdefault("written_owners", set())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        owner_id = getattr(obj, "owner_id", None)
+        if owner_id is not None:
+            owners.add(owner_id)
+
+
+def _statement_owners(orm_execute_state) -> Iterator[Any]:
+    """Owner ids a bulk UPDATE/DELETE is restricted to by its WHERE clause."""
+    mapper = orm_execute_state.bind_mapper
+    whereclause = getattr(orm_execute_state.statement, "whereclause", None)
+    if mapper is None or whereclause is None:
+        return
+    owner_column = mapper.columns.get(getattr(mapper.class_, "owner_column", ""))
+    if owner_column is None:
+        return
+    for clause in sa.sql.visitors.iterate(whereclause):
+        if (
+            isinstance(clause, sa.BinaryExpression)
+            and clause.left.compare(owner_column)
+            and isinstance(clause.right, sa.BindParameter)
+        ):
+            value = clause.right.effective_value
+            if clause.operator is operators.eq:
+                yield value
+            elif clause.operator is operators.in_op:
+                yield from value
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _track_bulk_writes(orm_execute_state):
+    if orm_execute_state.is_select:
+        return
+    session = orm_execute_state.session
+    session.info["wrote"] = True
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        # Query.update()/delete() skip the flush, and with it after_flush
+        session.info.setdefault("written_owners", set()).update(
+            _statement_owners(orm_execute_state)
+        )
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _record_committed_writes(session):
+    owners = session.info.pop("written_owners", None)
+    if owners:
+        replica_monitor.record_writes(owners)
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _reset_write_tracking(session, transaction):
+    if transaction.parent is None:
+        session.info.pop("wrote", None)
+        session.info.pop("written_owners", None)
+
+
+def _record_db_error(context) -> None:
+    # Only lost connections and failed connects: deadlocks, statement
+    # timeouts or a broken query say nothing about the server being down
+    if context.is_disconnect or context.connection is None:
+        db_breaker.record_failure()
+
+
+def record_database_error(error: Exception) -> None:
+    """Log an error the request fails on with 503.
+
+    Pool checkout timeouts never reach the engine's ``handle_error``, so
+    they are counted towards the circuit breaker here.
+    """
+    if isinstance(error, sa.exc.TimeoutError):
+        db_breaker.record_failure()
+        logger.warning("database_pool_timeout", error=str(error))
+        return
+    original = getattr(error, "orig", None) or error
+    log = (
+        logger.warning
+        if getattr(error, "connection_invalidated", False)
+        else logger.error
+    )
+    log(
+        "database_error",
+        error_type=type(original).__name__,
+        error=str(original).strip(),
+    )
+
+
+def _record_db_success(conn, cursor, statement, parameters, context, executemany):
+    db_breaker.record_success()
+
 
 # Initialize SQLAlchemy instance
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+
+
+def _apply_timeouts(app: Flask) -> None:
+    """Bound pool checkouts, connects and statements on Postgres, so that
+    a stalled server produces errors instead of hung workers."""
+    if not str(app.config["SQLALCHEMY_DATABASE_URI"]).startswith("postgresql"):
+        return
+    options = dict(app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    options.setdefault("pool_timeout", app.config["DB_POOL_TIMEOUT_SECONDS"])
+    options.setdefault(
+        "connect_args",
+        {
+            "connect_timeout": app.config["DB_CONNECT_TIMEOUT_SECONDS"],
+            "options": f"-c statement_timeout={app.config['DB_STATEMENT_TIMEOUT_MS']}",
+        },
+    )
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+
+
+def init_db(app: Flask) -> None:
+    _apply_timeouts(app)
+    db.init_app(app)
+    replica_monitor.init_app(app)
+    db_breaker.failure_threshold = app.config["DB_CIRCUIT_FAILURE_THRESHOLD"]
+    db_breaker.reset_timeout = app.config["DB_CIRCUIT_RESET_SECONDS"]
+
+    with app.app_context():
+        event.listen(db.engine, "handle_error", _record_db_error)
+        event.listen(db.engine, "after_cursor_execute", _record_db_success)
+
+    @app.errorhandler(sa.exc.OperationalError)
+    @app.errorhandler(sa.exc.TimeoutError)
+    def handle_database_unavailable(error):
+        record_database_error(error)
+        return (
+            {"error": "ServiceUnavailableError", "message": "database is unavailable"},
+            503,
+            {"Retry-After": str(int(db_breaker.reset_timeout))},
+        )
 
 
 def get_db() -> Session:
@@ -11,3 +280,25 @@ def get_db() -> Session:
     Get database session.
     """
     return db.session
+
+
+def has_replicas() -> bool:
+    return any(key and key.startswith(REPLICA_BIND_PREFIX) for key in db.engines)
+
+
+@contextmanager
+def read_replica(user_id: Optional[Any] = None) -> Iterator[None]:
+    """Route read-only queries in this block to a replica.
+
+    Falls back to the primary when no replica is configured or healthy, and
+    for ``user_id`` right after that user's own write (read-your-writes).
+    """
+    if user_id is not None and replica_monitor.wrote_recently(user_id):
+        yield
+        return
+
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
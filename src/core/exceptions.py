@@ -1,4 +1,10 @@
-import logging
+from flask import request
+from werkzeug.exceptions import HTTPException
+
+from src.core.log import get_logger
+
+logger = get_logger(__name__)
+
 
 class AuthenticationError(Exception):
     """Base class for authentication related errors"""
@@ -42,6 +48,20 @@ class InsufficientPermissionsError(AuthorizationError):
     pass
 
 
+class ServiceUnavailableError(Exception):
+    """Raised when a dependency such as the database is unavailable"""
+
+    pass
+
+
+class RequestValidationError(Exception):
+    """Raised when a request body fails schema validation"""
+
+    def __init__(self, errors: list):
+        super().__init__("Request validation failed")
+        self.errors = errors
+
+
 def register_error_handlers(app):
     @app.errorhandler(AuthenticationError)
     def handle_authentication_error(error):
@@ -58,11 +78,43 @@ def register_error_handlers(app):
             "message": "The requested resource was not found",
         }, 404
 
+    @app.errorhandler(RequestValidationError)
+    def handle_request_validation_error(error):
+        # Client error: no traceback, no ERROR-level logging
+        return {
+            "error": "ValidationError",
+            "message": str(error),
+            "details": error.errors,
+        }, 422
+
+    @app.errorhandler(ServiceUnavailableError)
+    def handle_service_unavailable(error):
+        return (
+            {"error": "ServiceUnavailableError", "message": str(error)},
+            503,
+            {"Retry-After": str(int(app.config["DB_CIRCUIT_RESET_SECONDS"]))},
+        )
+
+    @app.errorhandler(HTTPException)
+    def handle_http_exception(error):
+        # Keep headers such as Allow (405) and Retry-After (429, 503); the
+        # body is JSON now, so not its HTML Content-Type
+        headers = [
+            (name, value)
+            for name, value in error.get_headers()
+            if name.lower() != "content-type"
+        ]
+        return (
+            {"error": error.__class__.__name__, "message": error.description},
+            error.code,
+            headers,
+        )
+
     @app.errorhandler(Exception)
     def handle_generic_error(error):
         # Log the full error with traceback
-        logging.error(f"Unhandled error: {str(error)}", exc_info=True)
+        logger.exception("unhandled_error", method=request.method, path=request.path)
         return {
             "error": "InternalServerError",
-            "message": str(error),
+            "message": "An unexpected error occurred",
         }, 500
@@ -0,0 +1,230 @@
+import random
+import socket
+import time
+from typing import Any, Callable, Dict, Optional
+from uuid import uuid4
+
+import click
+import orjson
+import redis
+from flask import Flask
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+
+from src.core.log import get_logger
+
+logger = get_logger(__name__)
+
+JOBS_ENQUEUED = Counter("jobs_enqueued_total", "Jobs put on the queue", ["job"])
+JOBS_PROCESSED = Counter(
+    "jobs_processed_total", "Jobs run by workers", ["job", "status"]
+)
+JOB_DURATION = Histogram("job_duration_seconds", "Time spent running a job", ["job"])
+QUEUE_DEPTH = Gauge("jobs_queue_depth", "Jobs waiting in each list", ["list"])
+
+# Moves every delayed job that is due back onto the queue, atomically
+PROMOTE_DUE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, 100)
+for _, job in ipairs(due) do
+    redis.call('ZREM', KEYS[1], job)
+    redis.call('LPUSH', KEYS[2], job)
+end
+return #due
+"""
+
+
+class Task:
+    """A registered job handler; ``delay()`` enqueues it."""
+
+    def __init__(self, queue: "JobQueue", name: str, func: Callable):
+        self.queue = queue
+        self.name = name
+        self.func = func
+
+    def __call__(self, **payload: Any) -> Any:
+        return self.func(**payload)
+
+    def delay(self, **payload: Any) -> str:
+        return self.queue.enqueue(self.name, payload)
+
+
+class JobQueue:
+    """Redis-backed job queue with at-least-once delivery.
+
+    Jobs are LPUSHed onto ``<prefix>:queue``. A worker atomically moves each
+    job onto its own processing list and removes it only once the handler
+    returned, so jobs of a crashed worker are recovered by the next worker
+    to start. Failed jobs are retried with exponential backoff through the
+    ``<prefix>:delayed`` sorted set and end up on ``<prefix>:dead`` after
+    ``max_attempts``.
+    """
+
+    def __init__(self, prefix: str = "jobs"):
+        self.prefix = prefix
+        self.handlers: Dict[str, Task] = {}
+        self.redis: Optional[redis.Redis] = None
+        self.eager = False
+        self.max_attempts = 5
+        self.backoff = 2.0
+
+    def init_app(self, app: Flask) -> None:
+        self.redis = redis.Redis.from_url(app.config["REDIS_URL"])
+        self.eager = app.config["JOBS_EAGER"]
+        self.max_attempts = app.config["JOBS_MAX_ATTEMPTS"]
+        self.backoff = app.config["JOBS_RETRY_BACKOFF_SECONDS"]
+
+        @app.cli.command("worker")
+        @click.option("--burst", is_flag=True, help="Exit once the queue is empty.")
+        @click.option(
+            "--metrics-port", type=int, default=app.config["JOBS_METRICS_PORT"]
+        )
+        def worker_command(burst, metrics_port):
+            """Run a job worker."""
+            if metrics_port:
+                start_http_server(metrics_port)
+            Worker(self).run(burst=burst)
+
+    def key(self, name: str) -> str:
+        return f"{self.prefix}:{name}"
+
+    def job(self, name: str) -> Callable[[Callable], Task]:
+        def decorator(func: Callable) -> Task:
+            task = Task(self, name, func)
+            self.handlers[name] = task
+            return task
+
+        return decorator
+
+    def enqueue(self, name: str, payload: Dict[str, Any]) -> str:
+        job = {"id": uuid4().hex, "name": name, "payload": payload, "attempts": 0}
+        if self.eager:
+            # Run inline, e.g. in tests or development without Redis
+            self.handlers[name](**payload)
+            return job["id"]
+
+        self.redis.lpush(self.key("queue"), orjson.dumps(job))
+        JOBS_ENQUEUED.labels(name).inc()
+        return job["id"]
+
+    def retry_delay(self, attempts: int) -> float:
+        delay = self.backoff * 2 ** (attempts - 1)
+        return delay + random.uniform(0, delay / 2)
+
+    def stats(self) -> Dict[str, int]:
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.llen(self.key("queue"))
+        pipe.zcard(self.key("delayed"))
+        pipe.llen(self.key("dead"))
+        queued, delayed, dead = pipe.execute()
+        return {"queue": queued, "delayed": delayed, "dead": dead}
+
+
+class Worker:
+    heartbeat_ttl = 30
+    stats_interval = 10
+
+    def __init__(self, queue: JobQueue, poll_timeout: int = 1):
+        self.queue = queue
+        self.redis = queue.redis
+        self.poll_timeout = poll_timeout
+        self.worker_id = f"{socket.gethostname()}:{uuid4().hex[:8]}"
+        self.processing_key = queue.key(f"processing:{self.worker_id}")
+        self.heartbeat_key = queue.key(f"worker:{self.worker_id}")
+        self.promote_due = self.redis.register_script(PROMOTE_DUE_SCRIPT)
+        self.processed = 0
+
+    def run(self, burst: bool = False) -> None:
+        logger.info("worker_started", worker_id=self.worker_id)
+        self.recover_orphaned_jobs()
+        last_report = time.monotonic()
+        reported = 0
+        while True:
+            self.redis.set(self.heartbeat_key, 1, ex=self.heartbeat_ttl)
+            self.promote_due(
+                keys=[self.queue.key("delayed"), self.queue.key("queue")],
+                args=[time.time()],
+            )
+
+            raw = self.redis.blmove(
+                self.queue.key("queue"),
+                self.processing_key,
+                self.poll_timeout,
+                "RIGHT",
+                "LEFT",
+            )
+            if raw is not None:
+                self.process(raw)
+            elif burst and not self.redis.zcard(self.queue.key("delayed")):
+                break
+
+            elapsed = time.monotonic() - last_report
+            if elapsed >= self.stats_interval:
+                stats = self.queue.stats()
+                for name, depth in stats.items():
+                    QUEUE_DEPTH.labels(name).set(depth)
+                logger.info(
+                    "worker_throughput",
+                    jobs_per_second=round((self.processed - reported) / elapsed, 2),
+                    **stats,
+                )
+                last_report, reported = time.monotonic(), self.processed
+
+        self.redis.delete(self.heartbeat_key)
+        logger.info(
+            "worker_stopped", worker_id=self.worker_id, processed=self.processed
+        )
+
+    def process(self, raw: bytes) -> None:
+        job = orjson.loads(raw)
+        name = job["name"]
+        started = time.perf_counter()
+        try:
+            handler = self.queue.handlers[name]
+            handler(**job["payload"])
+        except Exception as e:
+            self.fail(raw, job, e)
+        else:
+            self.redis.lrem(self.processing_key, 1, raw)
+            JOBS_PROCESSED.labels(name, "succeeded").inc()
+        finally:
+            JOB_DURATION.labels(name).observe(time.perf_counter() - started)
+            self.processed += 1
+
+    def fail(self, raw: bytes, job: Dict[str, Any], error: Exception) -> None:
+        job["attempts"] += 1
+        job["last_error"] = repr(error)
+        pipe = self.redis.pipeline()
+        pipe.lrem(self.processing_key, 1, raw)
+        if job["attempts"] >= self.queue.max_attempts:
+            pipe.lpush(self.queue.key("dead"), orjson.dumps(job))
+            status = "dead"
+        else:
+            retry_at = time.time() + self.queue.retry_delay(job["attempts"])
+            pipe.zadd(self.queue.key("delayed"), {orjson.dumps(job): retry_at})
+            status = "retried"
+        pipe.execute()
+        JOBS_PROCESSED.labels(job["name"], status).inc()
+        logger.warning(
+            "job_failed",
+            job_id=job["id"],
+            job=job["name"],
+            attempts=job["attempts"],
+            status=status,
+            error=job["last_error"],
+        )
+
+    def recover_orphaned_jobs(self) -> None:
+        """Requeue jobs left on processing lists of workers that died."""
+        for key in self.redis.scan_iter(self.queue.key("processing:*")):
+            worker_id = key.decode().split(":", 2)[2]
+            if self.redis.exists(self.queue.key(f"worker:{worker_id}")):
+                continue
+            recovered = 0
+            while self.redis.lmove(key, self.queue.key("queue"), "RIGHT", "LEFT"):
+                recovered += 1
+            if recovered:
+                logger.warning(
+                    "jobs_recovered", worker_id=worker_id, recovered=recovered
+                )
+
+
+job_queue = JobQueue()
@@ -0,0 +1,237 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import jwt
+import orjson
+from cryptography.hazmat.primitives.asymmetric import ed25519, ed448, rsa
+from cryptography.hazmat.primitives.serialization import (
+    load_pem_private_key,
+    load_pem_public_key,
+)
+from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+
+from src.config.settings import settings
+
+SUPPORTED_ALGORITHMS = {"RS256", "RS384", "RS512", "EdDSA"}
+
+
+class SigningKey:
+    """An asymmetric JWT key with the window in which it is used for signing.
+
+    A key signs tokens between ``not_before`` and ``not_after``. It is
+    published (and accepted for verification) from the moment it is
+    configured until ``not_after`` plus the longest token lifetime, so
+    scheduled rotations are announced ahead of time and tokens signed just
+    before a rotation stay verifiable until they expire.
+    """
+
+    def __init__(
+        self,
+        kid: str,
+        algorithm: str,
+        public_key: Any,
+        private_key: Optional[Any] = None,
+        not_before: Optional[datetime] = None,
+        not_after: Optional[datetime] = None,
+    ):
+        if algorithm not in SUPPORTED_ALGORITHMS:
+            raise ValueError(f"Unsupported JWT algorithm for key {kid}: {algorithm}")
+        self.kid = kid
+        self.algorithm = algorithm
+        self.public_key = public_key
+        self.private_key = private_key
+        self.not_before = not_before
+        self.not_after = not_after
+
+    def can_sign(self, now: datetime) -> bool:
+        return (
+            self.private_key is not None
+            and (self.not_before is None or self.not_before <= now)
+            and (self.not_after is None or now < self.not_after)
+        )
+
+    def can_verify(self, now: datetime, grace: timedelta) -> bool:
+        return self.not_after is None or now < self.not_after + grace
+
+    def to_jwk(self) -> Dict[str, Any]:
+        if isinstance(self.public_key, rsa.RSAPublicKey):
+            jwk = RSAAlgorithm.to_jwk(self.public_key, as_dict=True)
+        else:
+            jwk = OKPAlgorithm.to_jwk(self.public_key, as_dict=True)
+        jwk.update({"kid": self.kid, "alg": self.algorithm, "use": "sig"})
+        return jwk
+
+
+class KeyRing:
+    """The set of asymmetric keys, looked up by ``kid``."""
+
+    def __init__(self, keys: List[SigningKey], grace: timedelta):
+        self.keys = {key.kid: key for key in keys}
+        self.grace = grace
+        self._jwks_cache: Dict[Tuple[str, ...], Tuple[bytes, str]] = {}
+
+    @property
+    def algorithms(self) -> List[str]:
+        return sorted({key.algorithm for key in self.keys.values()})
+
+    def signing_key(self, now: Optional[datetime] = None) -> SigningKey:
+        """Return the most recently activated key that may sign now."""
+        now = now or datetime.utcnow()
+        candidates = [key for key in self.keys.values() if key.can_sign(now)]
+        if not candidates:
+            raise RuntimeError("No active JWT signing key")
+        return max(candidates, key=lambda key: key.not_before or datetime.min)
+
+    def verification_key(
+        self, kid: str, now: Optional[datetime] = None
+    ) -> Optional[SigningKey]:
+        key = self.keys.get(kid)
+        if key is None or not key.can_verify(now or datetime.utcnow(), self.grace):
+            return None
+        return key
+
+    def jwks(self, now: Optional[datetime] = None) -> Tuple[bytes, str]:
+        """Return the JWKS document of the published keys and its ETag.
+
+        The encoded document only changes when a key enters or leaves the
+        published set, so it is built once per set.
+        """
+        now = now or datetime.utcnow()
+        published = tuple(
+            sorted(
+                kid for kid, key in self.keys.items() if key.can_verify(now, self.grace)
+            )
+        )
+        cached = self._jwks_cache.get(published)
+        if cached is None:
+            body = orjson.dumps(
+                {"keys": [self.keys[kid].to_jwk() for kid in published]}
+            )
+            cached = (body, hashlib.sha256(body).hexdigest()[:32])
+            self._jwks_cache[published] = cached
+        return cached
+
+
+def _read_pem(config: Dict[str, Any], name: str) -> Optional[bytes]:
+    if config.get(name):
+        return config[name].encode()
+    path = config.get(f"{name}_file")
+    if path:
+        with open(path, "rb") as f:
+            return f.read()
+    return None
+
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    # Naive UTC, like the rest of the token handling
+    if not value:
+        return None
+    # fromisoformat only accepts a "Z" suffix from Python 3.11 on
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _default_algorithm(public_key: Any) -> str:
+    if isinstance(public_key, rsa.RSAPublicKey):
+        return "RS256"
+    if isinstance(public_key, (ed25519.Ed25519PublicKey, ed448.Ed448PublicKey)):
+        return "EdDSA"
+    raise ValueError("JWT keys must be RSA or Ed25519/Ed448 keys")
+
+
+def load_key(config: Dict[str, Any]) -> SigningKey:
+    """Build a key from one ``JWT_KEYS`` entry.
+
+    Entries need a ``kid`` and either a private key (``private_key`` PEM or
+    ``private_key_file``) or, for verify-only keys, a public key
+    (``public_key`` / ``public_key_file``). ``alg``, ``not_before`` and
+    ``not_after`` (ISO 8601) are optional.
+    """
+    private_pem = _read_pem(config, "private_key")
+    private_key = (
+        load_pem_private_key(private_pem, password=None) if private_pem else None
+    )
+    if private_key is not None:
+        public_key = private_key.public_key()
+    else:
+        public_pem = _read_pem(config, "public_key")
+        if public_pem is None:
+            raise ValueError(f"JWT key {config.get('kid')} has no key material")
+        public_key = load_pem_public_key(public_pem)
+
+    return SigningKey(
+        kid=config["kid"],
+        algorithm=config.get("alg") or _default_algorithm(public_key),
+        public_key=public_key,
+        private_key=private_key,
+        not_before=_parse_datetime(config.get("not_before")),
+        not_after=_parse_datetime(config.get("not_after")),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_key_ring() -> Optional[KeyRing]:
+    """Return the configured key ring, or None when signing with HS256."""
+    if not settings.JWT_KEYS:
+        return None
+    # Tokens stay verifiable for as long as the longest-lived one can exist
+    grace = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    return KeyRing([load_key(config) for config in settings.JWT_KEYS], grace)
+
+
+def accepts_shared_secret(now: Optional[datetime] = None) -> bool:
+    """Whether tokens signed with ``JWT_SECRET_KEY`` (no ``kid``) are valid.
+
+    Always without a key ring; with one only until
+    ``JWT_ACCEPT_HS256_UNTIL``, so the shared secret stops minting valid
+    tokens once asymmetric keys are configured.
+    """
+    if get_key_ring() is None:
+        return True
+    until = _parse_datetime(settings.JWT_ACCEPT_HS256_UNTIL)
+    return until is not None and (now or datetime.utcnow()) < until
+
+
+def get_decode_key(header: Dict[str, Any]) -> Tuple[Any, str]:
+    """Resolve the key and algorithm to verify a token with from its header.
+
+    Tokens with a ``kid`` must use that key's algorithm; tokens without one
+    were signed with the shared secret and are only accepted while
+    ``accepts_shared_secret()``. Pinning the algorithm to the key rules out
+    algorithm confusion between the secret and public keys.
+    """
+    kid = header.get("kid")
+    key_ring = get_key_ring()
+    if kid is None:
+        if not accepts_shared_secret():
+            raise jwt.InvalidTokenError("Token has no signing key id")
+        key, algorithm = settings.JWT_SECRET_KEY, settings.JWT_ALGORITHM
+    else:
+        signing_key = key_ring.verification_key(kid) if key_ring else None
+        if signing_key is None:
+            raise jwt.InvalidTokenError(f"Unknown signing key: {kid}")
+        key, algorithm = signing_key.public_key, signing_key.algorithm
+
+    if header.get("alg") != algorithm:
+        raise jwt.InvalidAlgorithmError("Token algorithm does not match its key")
+    return key, algorithm
+
+
+def init_jwt_keys(app, jwt_manager) -> None:
+    """Let Flask-JWT-Extended verify tokens against the key ring."""
+    key_ring = get_key_ring()
+    if key_ring is not None:
+        algorithms = key_ring.algorithms
+        if settings.JWT_ACCEPT_HS256_UNTIL:
+            algorithms.append(settings.JWT_ALGORITHM)
+        app.config["JWT_DECODE_ALGORITHMS"] = algorithms
+
+    @jwt_manager.decode_key_loader
+    def decode_key(jwt_header, jwt_data):
+        return get_decode_key(jwt_header)[0]
@@ -0,0 +1,259 @@
+import atexit
+import logging
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, TextIO, Union
+from uuid import uuid4
+
+import orjson
+import structlog
+from flask import Flask, g, request
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+_log_queue: Optional[queue.Queue] = None
+_listener: Optional["EventListener"] = None
+# Events dropped because the queue was full
+dropped_events = 0
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Hand stdlib log records to the listener thread without formatting them.
+
+    ``QueueHandler.prepare`` formats the message on the calling thread, which
+    is exactly the work we want off the request path. The queue is
+    in-process, so the listener can format the record (traceback included)
+    itself.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Request-scoped context lives in contextvars of the calling thread
+        record.context = structlog.contextvars.get_contextvars()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        _enqueue(record)
+
+
+class QueueLogger:
+    """structlog logger that puts the processed event dict on the log queue.
+
+    Skips building a ``LogRecord`` (and the caller lookup that comes with it)
+    on the calling thread; the listener turns the event into a record.
+    Levels still follow the stdlib logger of the same name.
+    """
+
+    def __init__(self, name: Optional[str] = None):
+        self.name = name or "root"
+        self._logger = logging.getLogger(name)
+
+    def isEnabledFor(self, level: int) -> bool:
+        return self._logger.isEnabledFor(level)
+
+    def msg(self, event_dict: Dict[str, Any]) -> None:
+        _enqueue(event_dict)
+
+    debug = info = warning = error = critical = msg
+
+
+class EventListener(QueueListener):
+    """QueueListener that also accepts structlog event dicts."""
+
+    def handle(self, record: Union[logging.LogRecord, Dict[str, Any]]) -> None:
+        if isinstance(record, dict):
+            record = _event_to_record(record)
+        super().handle(record)
+
+
+class EventSampler:
+    """Keep only a fraction of high-volume events, keyed by event name."""
+
+    def __init__(self, rates: Dict[str, float]):
+        self.rates = rates
+
+    def __call__(self, logger, method_name, event_dict):
+        rate = self.rates.get(event_dict.get("event"))
+        if rate is None:
+            return event_dict
+        if random.random() >= rate:
+            raise structlog.DropEvent
+        event_dict["sample_rate"] = rate
+        return event_dict
+
+
+def _enqueue(item: Union[logging.LogRecord, Dict[str, Any]]) -> None:
+    # Never block the caller: drop and count when the writer falls behind
+    global dropped_events
+    try:
+        _log_queue.put_nowait(item)
+    except queue.Full:
+        dropped_events += 1
+
+
+def _event_to_record(event_dict: Dict[str, Any]) -> logging.LogRecord:
+    level = logging.getLevelName(event_dict["level"].upper())
+    record = logging.makeLogRecord(
+        {
+            "name": event_dict["logger"],
+            "levelno": level,
+            "levelname": logging.getLevelName(level),
+            "msg": event_dict,
+            "created": event_dict["timestamp"],
+        }
+    )
+    # Markers ProcessorFormatter uses to recognise structlog events
+    record._logger = record.name
+    record._name = event_dict["level"]
+    return record
+
+
+def _capture_exc_info(logger, method_name, event_dict):
+    # exc_info=True must be resolved on the thread handling the exception
+    if event_dict.get("exc_info") is True:
+        event_dict["exc_info"] = sys.exc_info()
+    return event_dict
+
+
+def _to_queue(logger, method_name, event_dict):
+    return (event_dict,), {}
+
+
+def _add_record_context(logger, method_name, event_dict):
+    record = event_dict["_record"]
+    event_dict["timestamp"] = record.created
+    for key, value in getattr(record, "context", {}).items():
+        event_dict.setdefault(key, value)
+    return event_dict
+
+
+def _format_timestamp(logger, method_name, event_dict):
+    event_dict["timestamp"] = datetime.fromtimestamp(
+        event_dict["timestamp"], timezone.utc
+    ).isoformat()
+    return event_dict
+
+
+def _orjson_dumps(obj, default=None) -> str:
+    return orjson.dumps(obj, default=default).decode()
+
+
+def configure_logging(
+    level: str = "INFO",
+    levels: Optional[Dict[str, str]] = None,
+    sample_rates: Optional[Dict[str, float]] = None,
+    queue_size: int = 10000,
+    stream: Optional[TextIO] = None,
+) -> None:
+    """Route structlog and stdlib output through a queue to a JSON writer.
+
+    On the calling thread, loggers only filter, sample and enqueue; rendering
+    and the actual write happen on a listener thread.
+    """
+    global _log_queue, _listener
+
+    shutdown_logging()
+
+    formatter = structlog.stdlib.ProcessorFormatter(
+        foreign_pre_chain=[
+            _add_record_context,
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+        ],
+        processors=[
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            _format_timestamp,
+            structlog.processors.format_exc_info,
+            structlog.processors.JSONRenderer(serializer=_orjson_dumps),
+        ],
+    )
+    output_handler = logging.StreamHandler(stream or sys.stderr)
+    output_handler.setFormatter(formatter)
+
+    _log_queue = queue.Queue(maxsize=queue_size)
+    _listener = EventListener(_log_queue, output_handler)
+    _listener.start()
+
+    root = logging.getLogger()
+    root.handlers = [NonBlockingQueueHandler(_log_queue)]
+    root.setLevel(level)
+    for name, logger_level in (levels or {}).items():
+        logging.getLogger(name).setLevel(logger_level)
+
+    structlog.configure(
+        processors=[
+            structlog.stdlib.filter_by_level,
+            EventSampler(sample_rates or {}),
+            structlog.contextvars.merge_contextvars,
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            structlog.processors.TimeStamper(fmt=None),
+            _capture_exc_info,
+            _to_queue,
+        ],
+        logger_factory=QueueLogger,
+        wrapper_class=structlog.make_filtering_bound_logger(logging.NOTSET),
+        cache_logger_on_first_use=True,
+    )
+
+
+def shutdown_logging() -> None:
+    """Stop the listener thread, flushing records still in the queue."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_listener_after_fork() -> None:
+    # Threads don't survive fork (e.g. gunicorn --preload); start a new one.
+    # It gets a new queue too: the parent's listener may have held the old
+    # one's mutex at fork time, and what is queued there is the parent's to
+    # write
+    global _log_queue, _listener
+    if _listener is not None:
+        _log_queue = queue.Queue(maxsize=_log_queue.maxsize)
+        for handler in logging.getLogger().handlers:
+            if isinstance(handler, NonBlockingQueueHandler):
+                handler.queue = _log_queue
+        _listener = EventListener(_log_queue, *_listener.handlers)
+        _listener.start()
+
+
+atexit.register(shutdown_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_listener_after_fork)
+
+
+def get_logger(name: Optional[str] = None):
+    return structlog.get_logger(name)
+
+
+def init_logging(app: Flask) -> None:
+    configure_logging(
+        level=app.config["LOG_LEVEL"],
+        levels=app.config["LOG_LEVELS"],
+        sample_rates=app.config["LOG_SAMPLE_RATES"],
+        queue_size=app.config["LOG_QUEUE_SIZE"],
+    )
+
+    @app.before_request
+    def bind_request_id():
+        request_id = request.headers.get(REQUEST_ID_HEADER, "")[:128] or uuid4().hex
+        g.request_id = request_id
+        structlog.contextvars.clear_contextvars()
+        structlog.contextvars.bind_contextvars(request_id=request_id)
+
+    @app.after_request
+    def add_request_id_header(response):
+        request_id = g.get("request_id")
+        if request_id:
+            response.headers[REQUEST_ID_HEADER] = request_id
+        return response
+
+    @app.teardown_request
+    def clear_request_context(exc):
+        structlog.contextvars.clear_contextvars()
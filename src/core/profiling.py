@@ -0,0 +1,207 @@
+import hashlib
+import hmac
+import os
+import random
+import re
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import click
+import orjson
+from flask import Flask, g, request
+
+from src.core.log import get_logger
+
+logger = get_logger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+
+# Paths stripped from frame file names to keep labels short
+_PATH_PREFIXES = sorted(
+    {sysconfig.get_paths()["purelib"], sysconfig.get_paths()["stdlib"], os.getcwd()},
+    key=len,
+    reverse=True,
+)
+
+Frame = Tuple[str, str, int]
+
+
+def _frame(code) -> Frame:
+    filename = code.co_filename
+    for prefix in _PATH_PREFIXES:
+        if filename.startswith(prefix):
+            filename = filename[len(prefix) :].lstrip(os.sep)
+            break
+    return code.co_name, filename, code.co_firstlineno
+
+
+class StackSampler:
+    """Samples the stack of one thread at a fixed wall-clock interval.
+
+    Runs on its own thread and reads the target's current frame through
+    ``sys._current_frames()``, so the profiled code is not instrumented and
+    time spent waiting (bcrypt, database, network) shows up too.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: List[Tuple[Frame, ...]] = []
+        self.weights: List[float] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="stack-sampler", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            if frame is None:
+                break
+            stack = []
+            while frame is not None:
+                stack.append(_frame(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+            self.samples.append(tuple(stack))
+            self.weights.append((now - last) * 1000)
+            last = now
+
+    def collapsed(self) -> str:
+        """Stacks in the collapsed format of flamegraph.pl and speedscope."""
+        counts: Dict[Tuple[Frame, ...], int] = Counter(self.samples)
+        return "".join(
+            ";".join(f"{name} ({filename}:{line})" for name, filename, line in stack)
+            + f" {count}\n"
+            for stack, count in counts.items()
+        )
+
+    def speedscope(self, name: str, duration_ms: float) -> bytes:
+        frames: Dict[Frame, int] = {}
+        samples = [
+            [frames.setdefault(frame, len(frames)) for frame in stack]
+            for stack in self.samples
+        ]
+        return orjson.dumps(
+            {
+                "$schema": "https://www.speedscope.app/file-format-schema.json",
+                "name": name,
+                "exporter": "src.core.profiling",
+                "shared": {
+                    "frames": [
+                        {"name": n, "file": filename, "line": line}
+                        for n, filename, line in frames
+                    ]
+                },
+                "profiles": [
+                    {
+                        "type": "sampled",
+                        "name": name,
+                        "unit": "milliseconds",
+                        "startValue": 0,
+                        "endValue": duration_ms,
+                        "samples": samples,
+                        "weights": [round(w, 3) for w in self.weights],
+                    }
+                ],
+            }
+        )
+
+
+def sign_profile_token(secret: str, expires: int) -> str:
+    signature = hmac.new(secret.encode(), str(expires).encode(), hashlib.sha256)
+    return f"{expires}.{signature.hexdigest()}"
+
+
+def verify_profile_token(secret: str, token: str) -> bool:
+    """Check an ``<expires>.<hmac>`` header value signed with ``secret``."""
+    if not secret:
+        return False
+    expires, _, _ = token.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(token, sign_profile_token(secret, int(expires)))
+
+
+def init_profiling(app: Flask) -> None:
+    """Profile selected requests and write flame graphs to PROFILING_DIR.
+
+    A request is profiled when it carries a valid signed ``X-Profile``
+    header, or with probability ``PROFILING_SAMPLE_RATE``. Nothing is
+    registered unless ``PROFILING_ENABLED`` is set.
+    """
+    secret = app.config["PROFILING_SECRET"]
+
+    @app.cli.command("profile-token")
+    @click.option("--ttl", default=300, help="Seconds the token stays valid.")
+    def profile_token(ttl):
+        """Print an X-Profile header value that profiles a request."""
+        if not secret:
+            raise click.UsageError("PROFILING_SECRET is not set")
+        click.echo(sign_profile_token(secret, int(time.time()) + ttl))
+
+    if not app.config["PROFILING_ENABLED"]:
+        return
+
+    sample_rate = app.config["PROFILING_SAMPLE_RATE"]
+    interval = app.config["PROFILING_INTERVAL_MS"] / 1000
+    output_dir = app.config["PROFILING_DIR"]
+    os.makedirs(output_dir, exist_ok=True)
+
+    @app.before_request
+    def start_profiling():
+        token = request.headers.get(PROFILE_HEADER)
+        if token is not None:
+            selected = verify_profile_token(secret, token)
+        else:
+            selected = sample_rate and random.random() < sample_rate
+        if not selected:
+            return
+        g.profiler = StackSampler(threading.get_ident(), interval)
+        g.profile_started = time.perf_counter()
+        g.profiler.start()
+
+    @app.teardown_request
+    def write_profile(exc):
+        profiler: Optional[StackSampler] = g.pop("profiler", None)
+        if profiler is None:
+            return
+        profiler.stop()
+        duration_ms = (time.perf_counter() - g.pop("profile_started")) * 1000
+        endpoint = request.endpoint or "unmatched"
+        name = f"{request.method} {endpoint} {duration_ms:.1f}ms"
+        # The request id comes from a client header; keep it out of the path
+        request_id = re.sub(r"[^\w-]", "", str(g.get("request_id", "")))[:32]
+        base = os.path.join(
+            output_dir,
+            f"{time.strftime('%Y%m%dT%H%M%S')}-{endpoint}-{duration_ms:.0f}ms-"
+            f"{request_id or os.getpid()}",
+        )
+        try:
+            with open(f"{base}.speedscope.json", "wb") as f:
+                f.write(profiler.speedscope(name, duration_ms))
+            with open(f"{base}.collapsed", "w") as f:
+                f.write(profiler.collapsed())
+        except OSError:
+            logger.exception("profile_write_failed", path=base)
+            return
+        logger.info(
+            "request_profiled",
+            endpoint=endpoint,
+            duration_ms=round(duration_ms, 1),
+            samples=len(profiler.samples),
+            path=base,
+        )
@@ -2,43 +2,62 @@ from datetime import datetime, timedelta
 from typing import Optional
 import jwt
 from passlib.context import CryptContext
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from src.config.settings import settings
+from src.core.exceptions import TokenExpiredError, TokenInvalidError
+from src.core.keys import get_decode_key, get_key_ring
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
-def create_access_token(
-    user_id: UUID, expires_delta: Optional[timedelta] = None
-) -> str:
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(
-            minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
+def _encode(user_id: UUID, token_type: str, expires_delta: timedelta) -> str:
+    now = datetime.utcnow()
+    # jti keeps tokens minted for the same user within one second distinct
+    to_encode = {
+        "exp": now + expires_delta,
+        "iat": now,
+        "jti": uuid4().hex,
+        "sub": str(user_id),
+        "type": token_type,
+    }
+
+    key_ring = get_key_ring()
+    if key_ring is None:
+        return jwt.encode(
+            to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM
         )
 
-    to_encode = {"exp": expire, "sub": str(user_id), "type": "access"}
+    key = key_ring.signing_key(now)
     return jwt.encode(
-        to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM
+        to_encode, key.private_key, algorithm=key.algorithm, headers={"kid": key.kid}
     )
 
 
-def create_refresh_token(
+def create_access_token(
     user_id: UUID, expires_delta: Optional[timedelta] = None
 ) -> str:
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    return _encode(
+        user_id,
+        "access",
+        expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
 
-    to_encode = {"exp": expire, "sub": str(user_id), "type": "refresh"}
-    return jwt.encode(
-        to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM
+
+def create_refresh_token(
+    user_id: UUID, expires_delta: Optional[timedelta] = None
+) -> str:
+    return _encode(
+        user_id,
+        "refresh",
+        expires_delta or timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
     )
 
 
+def create_reset_token(user_id: UUID, expires_delta: Optional[timedelta] = None) -> str:
+    return _encode(user_id, "reset", expires_delta or timedelta(hours=24))
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -49,11 +68,9 @@ def get_password_hash(password: str) -> str:
 
 def decode_token(token: str) -> dict:
     try:
-        payload = jwt.decode(
-            token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
-        )
-        return payload
+        key, algorithm = get_decode_key(jwt.get_unverified_header(token))
+        return jwt.decode(token, key, algorithms=[algorithm])
     except jwt.ExpiredSignatureError:
-        raise ValueError("Token has expired")
-    except jwt.JWTError:
-        raise ValueError("Invalid token")
+        raise TokenExpiredError("Token has expired")
+    except jwt.PyJWTError:
+        raise TokenInvalidError("Invalid token")
@@ -0,0 +1,52 @@
+from typing import Any, Union
+
+import orjson
+from flask import Flask, Response
+from flask.json.provider import JSONProvider
+from pydantic import BaseModel
+
+
+def _default(obj: Any) -> Any:
+    """Fallback for types orjson doesn't serialize natively."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson.
+
+    orjson natively handles datetimes, UUIDs, enums and dataclasses, so
+    ``jsonify`` and dicts returned from views skip the stdlib encoder.
+    """
+
+    option = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, default=_default, option=self.option).decode()
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=_default, option=self.option),
+            mimetype="application/json",
+        )
+
+
+def model_response(model: BaseModel, status: int = 200) -> Response:
+    """Serialize a pydantic model straight into a JSON response body.
+
+    ``model_dump_json`` encodes in pydantic-core, skipping the intermediate
+    dict and the second encoding pass ``jsonify(model.dict())`` does.
+    """
+    return Response(model.model_dump_json(), status=status, mimetype="application/json")
+
+
+def init_json(app: Flask) -> None:
+    app.json_provider_class = ORJSONProvider
+    app.json = ORJSONProvider(app)
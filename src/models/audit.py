@@ -0,0 +1,20 @@
+from uuid import uuid4
+from sqlalchemy import Column, String, Uuid
+
+from .base import Base
+
+
+class AuthEvent(Base):
+    __tablename__ = "auth_events"
+
+    id = Column(Uuid, primary_key=True, default=uuid4)
+    event_type = Column(String(32), nullable=False, index=True)
+    # Not a foreign key: the trail outlives deleted users, and failed logins
+    # may name accounts that don't exist
+    user_id = Column(Uuid, index=True)
+    email = Column(String)
+    provider = Column(String)  # OAuth provider of oauth_login events
+    reason = Column(String)  # Why a login failed
+    ip_address = Column(String(45))
+    user_agent = Column(String(256))
+    request_id = Column(String(128))
@@ -5,12 +5,19 @@ from src.core.database import db
 
 class Base(db.Model):
     __abstract__ = True
+    # Column holding the id of the user a row belongs to
+    owner_column = "user_id"
 
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
     )
 
+    @property
+    def owner_id(self):
+        """Id of the user this row belongs to, used for read-your-writes routing."""
+        return getattr(self, self.owner_column, None)
+
     def save(self):
         db.session.add(self)
         db.session.commit()
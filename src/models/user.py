@@ -1,7 +1,6 @@
 from datetime import datetime
 from uuid import uuid4
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Enum
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Enum, Uuid
 from sqlalchemy.orm import relationship
 
 from .base import Base
@@ -17,13 +16,20 @@ class RoleType(enum.Enum):
 
 class User(Base):
     __tablename__ = "users"
+    owner_column = "id"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    id = Column(Uuid, primary_key=True, default=uuid4)
     email = Column(String, unique=True, nullable=False, index=True)
     password_hash = Column(String(128))
     is_active = Column(Boolean, default=True)
     is_verified = Column(Boolean, default=False)
-    role = Column(Enum(RoleType), default=RoleType.USER)
+    # Native enum type on Postgres, VARCHAR with a CHECK constraint elsewhere
+    role = Column(
+        Enum(RoleType, name="roletype", create_constraint=True, validate_strings=True),
+        default=RoleType.USER,
+    )
+    # Written in batches by the audit log, so it may trail by a flush interval
+    last_login_at = Column(DateTime)
 
     # OAuth related fields
     oauth_provider = Column(String)  # 'google' or 'github'
@@ -44,11 +50,15 @@ class User(Base):
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    id = Column(Uuid, primary_key=True, default=uuid4)
     token = Column(String, unique=True, nullable=False)
     expires_at = Column(DateTime, nullable=False)
     is_revoked = Column(Boolean, default=False)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    # Tokens rotated from the same login share a family
+    family_id = Column(Uuid, index=True)
+    # Set when the token was exchanged for a new pair
+    rotated_at = Column(DateTime)
+    user_id = Column(Uuid, ForeignKey("users.id"), nullable=False)
 
     user = relationship("User", back_populates="refresh_tokens")
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -57,11 +67,11 @@ class RefreshToken(Base):
 class PasswordResetToken(Base):
     __tablename__ = "password_reset_tokens"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    id = Column(Uuid, primary_key=True, default=uuid4)
     token = Column(String, unique=True, nullable=False)
     expires_at = Column(DateTime, nullable=False)
     is_used = Column(Boolean, default=False)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    user_id = Column(Uuid, ForeignKey("users.id"), nullable=False)
 
     user = relationship("User", back_populates="reset_tokens")
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -1,7 +1,10 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from typing import List, Optional
 from enum import Enum
 from datetime import datetime
+from uuid import UUID
+
+from src.config.settings import settings
 
 
 class RoleEnum(str, Enum):
@@ -31,6 +34,13 @@ class TokenResponse(BaseModel):
     token_type: str = "bearer"
 
 
+class UserInfo(BaseModel):
+    id: str
+    email: EmailStr
+    role: RoleEnum
+    is_verified: bool
+
+
 class TokenPayload(BaseModel):
     sub: str
     exp: datetime
@@ -55,3 +65,27 @@ class OAuthResponse(BaseModel):
     access_token: str
     refresh_token: str
     provider: str
+
+
+class TokenIntrospectionRequest(BaseModel):
+    tokens: List[str] = Field(
+        ..., min_length=1, max_length=settings.INTROSPECTION_MAX_TOKENS
+    )
+
+
+class TokenIntrospection(BaseModel):
+    active: bool
+    sub: Optional[str] = None
+    role: Optional[RoleEnum] = None
+    exp: Optional[int] = None
+    token_type: Optional[str] = None
+    # Seconds the gateway may cache this entry for
+    cache_ttl: int = 0
+
+
+class TokenIntrospectionResponse(BaseModel):
+    results: List[TokenIntrospection]
+
+
+class UserBatchRequest(BaseModel):
+    ids: List[UUID] = Field(..., min_length=1, max_length=settings.USER_BATCH_MAX_IDS)
@@ -0,0 +1,185 @@
+import atexit
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID, uuid4
+
+import sqlalchemy as sa
+from flask import Flask, g, has_request_context, request
+from prometheus_client import Counter
+
+from src.core.database import db
+from src.core.log import get_logger
+from src.models.audit import AuthEvent
+from src.models.user import User
+
+logger = get_logger(__name__)
+
+AUDIT_EVENTS_WRITTEN = Counter(
+    "audit_events_written_total", "Authentication events written to the database"
+)
+AUDIT_EVENTS_DROPPED = Counter(
+    "audit_events_dropped_total", "Authentication events dropped", ["reason"]
+)
+
+# Events that update users.last_login_at
+LOGIN_EVENTS = {"login_succeeded", "oauth_login"}
+
+# Rows per INSERT statement; keeps the bind parameter count well under
+# driver limits
+INSERT_CHUNK_SIZE = 500
+
+_update_last_login = (
+    sa.update(User.__table__).where(
+        User.__table__.c.id == sa.bindparam("user_id"),
+        sa.or_(
+            User.__table__.c.last_login_at.is_(None),
+            User.__table__.c.last_login_at < sa.bindparam("logged_in_at"),
+        ),
+    )
+    # Keep updated_at (and with it the user's ETag) as is
+    .values(
+        last_login_at=sa.bindparam("logged_in_at"),
+        updated_at=User.__table__.c.updated_at,
+    )
+)
+
+
+class AuditLog:
+    """Buffers authentication events in-process and writes them in batches.
+
+    ``record()`` only appends to a list; a background thread flushes the
+    buffer every ``flush_interval`` seconds or as soon as ``flush_size``
+    events are waiting, with multi-row INSERTs and one ``last_login_at``
+    UPDATE per user. When the buffer is full new events are dropped and
+    counted rather than blocking the request. Events still buffered when
+    the process dies abruptly are lost.
+    """
+
+    def __init__(self):
+        self.app: Optional[Flask] = None
+        self.enabled = False
+        self.buffer_size = 10000
+        self.flush_size = 500
+        self.flush_interval = 1.0
+        self._events: List[Dict[str, Any]] = []
+        self._last_logins: Dict[UUID, datetime] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    def init_app(self, app: Flask) -> None:
+        self.app = app
+        self.enabled = app.config["AUDIT_ENABLED"]
+        self.buffer_size = app.config["AUDIT_BUFFER_SIZE"]
+        self.flush_size = app.config["AUDIT_FLUSH_SIZE"]
+        self.flush_interval = app.config["AUDIT_FLUSH_INTERVAL_SECONDS"]
+
+    def record(
+        self, event_type: str, user_id: Optional[UUID] = None, **fields: Any
+    ) -> None:
+        if not self.enabled:
+            return
+
+        now = datetime.utcnow()
+        event = {
+            "id": uuid4(),
+            "event_type": event_type,
+            "user_id": user_id,
+            "created_at": now,
+            "updated_at": now,
+            "email": fields.get("email"),
+            "provider": fields.get("provider"),
+            "reason": fields.get("reason"),
+            "ip_address": None,
+            "user_agent": None,
+            "request_id": None,
+        }
+        if has_request_context():
+            event["ip_address"] = request.remote_addr
+            event["user_agent"] = request.user_agent.string[:256] or None
+            event["request_id"] = g.get("request_id")
+
+        with self._lock:
+            if len(self._events) >= self.buffer_size:
+                AUDIT_EVENTS_DROPPED.labels("buffer_full").inc()
+                return
+            self._events.append(event)
+            if user_id is not None and event_type in LOGIN_EVENTS:
+                self._last_logins[user_id] = now
+            pending = len(self._events)
+
+        self._ensure_flusher()
+        if pending >= self.flush_size:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """Write all buffered events; returns how many were written."""
+        with self._lock:
+            events, self._events = self._events, []
+            last_logins, self._last_logins = self._last_logins, {}
+        if not events:
+            return 0
+
+        try:
+            with self.app.app_context(), db.engine.begin() as conn:
+                for start in range(0, len(events), INSERT_CHUNK_SIZE):
+                    chunk = events[start : start + INSERT_CHUNK_SIZE]
+                    conn.execute(sa.insert(AuthEvent.__table__).values(chunk))
+                if last_logins:
+                    conn.execute(
+                        _update_last_login,
+                        [
+                            {"user_id": user_id, "logged_in_at": logged_in_at}
+                            for user_id, logged_in_at in last_logins.items()
+                        ],
+                    )
+        except Exception:
+            AUDIT_EVENTS_DROPPED.labels("flush_failed").inc(len(events))
+            logger.exception("audit_flush_failed", events=len(events))
+            return 0
+
+        AUDIT_EVENTS_WRITTEN.inc(len(events))
+        return len(events)
+
+    def shutdown(self) -> None:
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout=5)
+        if self.app is not None:
+            self.flush()
+
+    def _ensure_flusher(self) -> None:
+        # Threads don't survive fork, so each worker process starts its own
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="audit-flusher", daemon=True
+            )
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def _reset_after_fork(self) -> None:
+        # Events buffered before the fork are the parent's to write
+        self._lock = threading.Lock()
+        self._events = []
+        self._last_logins = {}
+
+
+audit_log = AuditLog()
+atexit.register(audit_log.shutdown)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=audit_log._reset_after_fork)
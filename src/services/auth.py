@@ -1,26 +1,63 @@
+import hashlib
+import time
 from datetime import datetime, timedelta
-from typing import Optional, Tuple
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Union
 from sqlalchemy.orm import Session
-from uuid import UUID
+from uuid import UUID, uuid4
 import jwt
+import orjson
+import redis
 from authlib.integrations.flask_client import OAuth
+from prometheus_client import Counter
 
 from src.core.security import (
     verify_password,
     get_password_hash,
     create_access_token,
     create_refresh_token,
+    create_reset_token,
     decode_token,
 )
+from src.core.cache import MemoryCache, RedisCache
+from src.core.database import has_replicas, read_replica
+from src.core.log import get_logger
+from src.services.audit import audit_log
+from src.services.email import send_password_reset_email
+from src.services.users import get_user_cache
 from src.models.user import User, RefreshToken, PasswordResetToken, RoleType
+from src.schemas.auth import TokenIntrospection
 from src.core.exceptions import (
+    AuthenticationError,
     InvalidCredentialsError,
     TokenExpiredError,
     UserNotFoundError,
     TokenInvalidError,
+    ServiceUnavailableError,
 )
 from src.config.settings import settings
 
+logger = get_logger(__name__)
+
+REFRESH_REPLAYS = Counter(
+    "refresh_token_replays_total",
+    "Refresh requests presenting an already rotated token",
+    ["outcome"],
+)
+
+
+@lru_cache(maxsize=None)
+def get_rotation_cache() -> Union[MemoryCache, RedisCache]:
+    """Cache of the token pairs issued by recent rotations, keyed by the
+    hash of the refresh token they replaced."""
+    if settings.REFRESH_REUSE_CACHE == "redis":
+        return RedisCache(settings.REDIS_URL, "refresh-rotations")
+    return MemoryCache()
+
+
+def _rotation_key(refresh_token: str) -> str:
+    return hashlib.sha256(refresh_token.encode()).hexdigest()
+
 
 class AuthService:
     def __init__(self, db: Session):
@@ -56,15 +93,27 @@ class AuthService:
         )
 
     def authenticate_user(self, email: str, password: str) -> Tuple[User, str, str]:
-        user = self.db.query(User).filter(User.email == email).first()
+        with read_replica():
+            user = self.db.query(User).filter(User.email == email).first()
+        if not user and has_replicas():
+            # The account may be newer than what the replica has replayed
+            user = self.db.query(User).filter(User.email == email).first()
         if not user or not verify_password(password, user.password_hash):
+            audit_log.record(
+                "login_failed",
+                user.id if user else None,
+                email=email,
+                reason="invalid_credentials",
+            )
             raise InvalidCredentialsError("Invalid email or password")
 
         if not user.is_active:
+            audit_log.record("login_failed", user.id, email=email, reason="inactive")
             raise InvalidCredentialsError("User account is deactivated")
 
         access_token = create_access_token(user.id)
         refresh_token = self._create_refresh_token(user.id)
+        audit_log.record("login_succeeded", user.id, email=email)
 
         return user, access_token, refresh_token
 
@@ -78,24 +127,44 @@ class AuthService:
         self.db.add(user)
         self.db.commit()
         self.db.refresh(user)
+        get_user_cache().invalidate(user.id)
 
         return user
 
-    def _create_refresh_token(self, user_id: UUID) -> str:
+    def _issue_refresh_token(
+        self, user_id: UUID, family_id: Optional[UUID] = None
+    ) -> str:
+        """Add a new refresh token to the session; the caller commits."""
         token = create_refresh_token(user_id)
         expires_at = datetime.utcnow() + timedelta(
             days=settings.REFRESH_TOKEN_EXPIRE_DAYS
         )
 
         refresh_token = RefreshToken(
-            user_id=user_id, token=token, expires_at=expires_at
+            user_id=user_id,
+            token=token,
+            expires_at=expires_at,
+            family_id=family_id or uuid4(),
         )
         self.db.add(refresh_token)
+
+        return token
+
+    def _create_refresh_token(self, user_id: UUID) -> str:
+        token = self._issue_refresh_token(user_id)
         self.db.commit()
 
         return token
 
     def refresh_tokens(self, refresh_token: str) -> Tuple[str, str]:
+        """Exchange a refresh token for a new token pair.
+
+        Each refresh token can be exchanged once. Presenting it again within
+        ``REFRESH_REUSE_WINDOW_SECONDS`` (parallel refreshes, retries after
+        a timeout) returns the pair issued by the first exchange. Presenting
+        it later is treated as token theft and revokes every token rotated
+        from the same login.
+        """
         try:
             payload = decode_token(refresh_token)
             if payload["type"] != "refresh":
@@ -103,57 +172,253 @@ class AuthService:
 
             token_record = (
                 self.db.query(RefreshToken)
-                .filter(
-                    RefreshToken.token == refresh_token,
-                    RefreshToken.is_revoked == False,
-                )
+                .filter(RefreshToken.token == refresh_token)
                 .first()
             )
 
             if not token_record or token_record.expires_at < datetime.utcnow():
                 raise TokenExpiredError("Refresh token has expired")
+            if token_record.is_revoked:
+                return self._replay_refresh(token_record)
 
-            # Revoke the old refresh token
-            token_record.is_revoked = True
-            self.db.commit()
-
-            # Create new tokens
             user_id = UUID(payload["sub"])
             new_access_token = create_access_token(user_id)
-            new_refresh_token = self._create_refresh_token(user_id)
+            new_refresh_token = self._issue_refresh_token(
+                user_id, token_record.family_id
+            )
+
+            # Only one concurrent request can flip the flag; on Postgres the
+            # others wait for its commit and then take the replay path
+            rotated = (
+                self.db.query(RefreshToken)
+                .filter(
+                    RefreshToken.id == token_record.id,
+                    RefreshToken.is_revoked == False,
+                )
+                .update(
+                    {
+                        RefreshToken.is_revoked: True,
+                        RefreshToken.rotated_at: datetime.utcnow(),
+                    },
+                    synchronize_session=False,
+                )
+            )
+            if not rotated:
+                self.db.rollback()
+                token_record = (
+                    self.db.query(RefreshToken)
+                    .filter(RefreshToken.token == refresh_token)
+                    .first()
+                )
+                return self._replay_refresh(token_record)
+
+            # Cached before the commit, so that requests released by it
+            # find the pair
+            window = settings.REFRESH_REUSE_WINDOW_SECONDS
+            if window > 0:
+                try:
+                    get_rotation_cache().set(
+                        _rotation_key(refresh_token),
+                        orjson.dumps([new_access_token, new_refresh_token]),
+                        window,
+                    )
+                except redis.RedisError:
+                    # Replays within the window then fail as cache misses
+                    logger.warning("refresh_rotation_cache_unavailable", exc_info=True)
+            self.db.commit()
+            audit_log.record("token_refreshed", user_id)
 
             return new_access_token, new_refresh_token
 
         except (jwt.ExpiredSignatureError, jwt.InvalidTokenError):
             raise TokenInvalidError("Invalid refresh token")
 
-    def create_password_reset_token(self, email: str) -> str:
-        user = self.db.query(User).filter(User.email == email).first()
-        if not user:
-            raise UserNotFoundError("User not found")
+    def _replay_refresh(self, token_record: RefreshToken) -> Tuple[str, str]:
+        """Answer a refresh with an already revoked token."""
+        if token_record.rotated_at is None:
+            # Revoked by a logout or password reset, not by a rotation
+            raise TokenInvalidError("Refresh token has been revoked")
+
+        window = timedelta(seconds=settings.REFRESH_REUSE_WINDOW_SECONDS)
+        if datetime.utcnow() - token_record.rotated_at <= window:
+            try:
+                cached = get_rotation_cache().get(_rotation_key(token_record.token))
+            except redis.RedisError:
+                logger.warning("refresh_rotation_cache_unavailable", exc_info=True)
+                cached = None
+            if cached is not None:
+                access_token, refresh_token = orjson.loads(cached)
+                # Don't hand out a pair revoked since, e.g. by a logout
+                still_active = (
+                    self.db.query(RefreshToken.id)
+                    .filter(
+                        RefreshToken.token == refresh_token,
+                        RefreshToken.is_revoked == False,
+                    )
+                    .first()
+                )
+                if still_active is None:
+                    raise TokenInvalidError("Refresh token has been revoked")
+                REFRESH_REPLAYS.labels("served").inc()
+                audit_log.record("token_refresh_replayed", token_record.user_id)
+                return access_token, refresh_token
+            # Rotated by a process that doesn't share the cache; too recent
+            # to be treated as theft
+            REFRESH_REPLAYS.labels("cache_miss").inc()
+            raise TokenInvalidError("Refresh token has already been used")
+
+        REFRESH_REPLAYS.labels("reuse_detected").inc()
+        revoked = self.revoke_token_family(token_record)
+        self.db.commit()
+        logger.warning(
+            "refresh_token_reuse_detected",
+            user_id=str(token_record.user_id),
+            family_id=str(token_record.family_id),
+            revoked=revoked,
+        )
+        audit_log.record(
+            "refresh_token_reused", token_record.user_id, reason="family_revoked"
+        )
+        raise TokenInvalidError("Refresh token has already been used")
+
+    def revoke_token_family(self, token_record: RefreshToken) -> int:
+        """Revoke every active token rotated from the same login as
+        ``token_record``; the caller commits."""
+        if token_record.family_id is None:
+            # Issued before token families existed
+            return self.revoke_all_refresh_tokens(token_record.user_id)
+        return (
+            self.db.query(RefreshToken)
+            .filter(
+                RefreshToken.family_id == token_record.family_id,
+                RefreshToken.is_revoked == False,
+            )
+            .update({RefreshToken.is_revoked: True}, synchronize_session=False)
+        )
 
-        # Invalidate any existing reset tokens
-        existing_tokens = (
+    def revoke_all_refresh_tokens(self, user_id: UUID) -> int:
+        """Revoke every active refresh token of a user in a single UPDATE.
+
+        The caller is responsible for committing. Returns the number of
+        revoked tokens.
+        """
+        return (
+            self.db.query(RefreshToken)
+            .filter(
+                RefreshToken.user_id == user_id,
+                RefreshToken.is_revoked == False,
+            )
+            .update({RefreshToken.is_revoked: True}, synchronize_session=False)
+        )
+
+    def invalidate_reset_tokens(self, user_id: UUID) -> int:
+        """Mark every unused password reset token of a user as used in a
+        single UPDATE.
+
+        The caller is responsible for committing. Returns the number of
+        invalidated tokens.
+        """
+        return (
             self.db.query(PasswordResetToken)
             .filter(
-                PasswordResetToken.user_id == user.id,
+                PasswordResetToken.user_id == user_id,
                 PasswordResetToken.is_used == False,
             )
-            .all()
+            .update({PasswordResetToken.is_used: True}, synchronize_session=False)
         )
-        for token in existing_tokens:
-            token.is_used = True
+
+    def logout_all(self, user_id: UUID) -> int:
+        revoked = self.revoke_all_refresh_tokens(user_id)
+        self.db.commit()
+        return revoked
+
+    def introspect_tokens(self, tokens: List[str]) -> List[TokenIntrospection]:
+        """Check a batch of tokens with a fixed number of queries.
+
+        Every token is decoded locally. The user status behind all of them
+        is then loaded in a single query (repeated on the primary for users
+        a replica doesn't have yet), and refresh tokens are checked against
+        revocation in another. Active access tokens may be cached until
+        they expire; refresh tokens must not be cached.
+        """
+        now = int(time.time())
+        payloads: List[Optional[dict]] = []
+        for token in tokens:
+            try:
+                payload = decode_token(token)
+                payload["sub"] = str(UUID(payload["sub"]))
+            except (AuthenticationError, KeyError, ValueError):
+                payload = None
+            payloads.append(payload)
+
+        user_ids = {UUID(payload["sub"]) for payload in payloads if payload}
+        users: Dict[str, Tuple[RoleType, bool]] = {}
+        if user_ids:
+            query = self.db.query(User.id, User.role, User.is_active)
+            with read_replica():
+                rows = query.filter(User.id.in_(user_ids)).all()
+            users = {str(row.id): (row.role, row.is_active) for row in rows}
+            missing = [user_id for user_id in user_ids if str(user_id) not in users]
+            if missing and has_replicas():
+                # Accounts newer than what the replica has replayed
+                rows = query.filter(User.id.in_(missing)).all()
+                users.update({str(row.id): (row.role, row.is_active) for row in rows})
+
+        refresh_tokens = [
+            token
+            for token, payload in zip(tokens, payloads)
+            if payload and payload.get("type") == "refresh"
+        ]
+        live_refresh_tokens = set()
+        if refresh_tokens:
+            live_refresh_tokens = {
+                row.token
+                for row in self.db.query(RefreshToken.token).filter(
+                    RefreshToken.token.in_(refresh_tokens),
+                    RefreshToken.is_revoked == False,
+                )
+            }
+
+        results = []
+        for token, payload in zip(tokens, payloads):
+            user = users.get(payload["sub"]) if payload else None
+            if (
+                user is None
+                or not user[1]
+                or payload.get("type") not in ("access", "refresh")
+                or (payload["type"] == "refresh" and token not in live_refresh_tokens)
+            ):
+                results.append(TokenIntrospection(active=False))
+                continue
+
+            results.append(
+                TokenIntrospection(
+                    active=True,
+                    sub=payload["sub"],
+                    role=user[0].value,
+                    exp=payload["exp"],
+                    token_type=payload["type"],
+                    # Refresh tokens can be revoked at any time (rotation,
+                    # logout, password reset), so gateways must re-check them
+                    cache_ttl=(
+                        max(payload["exp"] - now, 0)
+                        if payload["type"] == "access"
+                        else 0
+                    ),
+                )
+            )
+        return results
+
+    def create_password_reset_token(self, email: str) -> str:
+        user = self.db.query(User).filter(User.email == email).first()
+        if not user:
+            raise UserNotFoundError("User not found")
+
+        # Invalidate any existing reset tokens
+        self.invalidate_reset_tokens(user.id)
 
         # Create new reset token
-        token = jwt.encode(
-            {
-                "sub": str(user.id),
-                "exp": datetime.utcnow() + timedelta(hours=24),
-                "type": "reset",
-            },
-            settings.JWT_SECRET_KEY,
-            algorithm=settings.JWT_ALGORITHM,
-        )
+        token = create_reset_token(user.id)
 
         reset_token = PasswordResetToken(
             user_id=user.id,
@@ -163,6 +428,17 @@ class AuthService:
         self.db.add(reset_token)
         self.db.commit()
 
+        # Delivered by a worker so the request doesn't wait on SMTP
+        try:
+            send_password_reset_email.delay(email=user.email, token=token)
+        except redis.RedisError as e:
+            logger.error(
+                "password_reset_email_not_queued", user_id=str(user.id), error=repr(e)
+            )
+            raise ServiceUnavailableError(
+                "Password reset email could not be sent, try again later"
+            ) from e
+
         return token
 
     def reset_password(self, token: str, new_password: str) -> bool:
@@ -188,8 +464,14 @@ class AuthService:
                 raise UserNotFoundError("User not found")
 
             user.password_hash = get_password_hash(new_password)
-            token_record.is_used = True
+            # Burn this and any other outstanding reset token, and end every
+            # session opened with the old password
+            self.invalidate_reset_tokens(user.id)
+            self.revoke_all_refresh_tokens(user.id)
+            user_id = user.id
             self.db.commit()
+            # Read before the commit, which expires the user
+            get_user_cache().invalidate(user_id)
 
             return True
 
@@ -222,8 +504,10 @@ class AuthService:
             self.db.add(user)
             self.db.commit()
             self.db.refresh(user)
+            get_user_cache().invalidate(user.id)
 
         access_token = create_access_token(user.id)
         refresh_token = self._create_refresh_token(user.id)
+        audit_log.record("oauth_login", user.id, email=email, provider=provider)
 
         return user, access_token, refresh_token
@@ -0,0 +1,57 @@
+import smtplib
+from email.message import EmailMessage
+from typing import List
+
+from src.config.settings import settings
+from src.core.jobs import job_queue
+
+
+class SMTPBackend:
+    def send(self, message: EmailMessage) -> None:
+        with smtplib.SMTP(settings.MAIL_HOST, settings.MAIL_PORT, timeout=10) as smtp:
+            if settings.MAIL_USE_TLS:
+                smtp.starttls()
+            if settings.MAIL_USERNAME:
+                smtp.login(settings.MAIL_USERNAME, settings.MAIL_PASSWORD)
+            smtp.send_message(message)
+
+
+class MemoryBackend:
+    """Keeps sent messages in ``outbox`` instead of delivering them."""
+
+    def __init__(self):
+        self.outbox: List[EmailMessage] = []
+
+    def send(self, message: EmailMessage) -> None:
+        self.outbox.append(message)
+
+
+def get_mail_backend():
+    if settings.MAIL_BACKEND == "memory":
+        return memory_backend
+    return smtp_backend
+
+
+smtp_backend = SMTPBackend()
+memory_backend = MemoryBackend()
+
+
+def send_email(to: str, subject: str, body: str) -> None:
+    message = EmailMessage()
+    message["From"] = settings.MAIL_FROM
+    message["To"] = to
+    message["Subject"] = subject
+    message.set_content(body)
+    get_mail_backend().send(message)
+
+
+@job_queue.job("send_password_reset_email")
+def send_password_reset_email(email: str, token: str) -> None:
+    reset_url = settings.PASSWORD_RESET_URL.format(token=token)
+    send_email(
+        email,
+        "Reset your password",
+        "Someone asked to reset the password of your account.\n\n"
+        f"Follow this link within 24 hours to choose a new one:\n{reset_url}\n\n"
+        "If this wasn't you, you can ignore this email.",
+    )
@@ -0,0 +1,149 @@
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+import orjson
+import redis
+from prometheus_client import Counter
+from sqlalchemy.orm import Session
+
+from src.core.cache import MemoryCache, RedisCache
+from src.core.database import has_replicas, read_replica
+from src.core.log import get_logger
+from src.models.user import User
+from src.config.settings import settings
+
+logger = get_logger(__name__)
+
+USER_LOOKUPS = Counter(
+    "user_batch_lookups_total",
+    "Users resolved by the batch endpoint, by where they were found",
+    ["source"],
+)
+
+UserRecord = Dict[str, Any]
+
+
+class UserCache:
+    """Read-through cache of compact user records.
+
+    A per-process LRU sits in front of an optional Redis cache shared by
+    all workers. Redis errors count as misses, so an outage only costs
+    database queries.
+    """
+
+    def __init__(
+        self,
+        local: MemoryCache,
+        shared: Optional[RedisCache],
+        ttl: float,
+        local_ttl: float,
+    ):
+        self.local = local
+        self.shared = shared
+        self.ttl = ttl
+        self.local_ttl = local_ttl if shared is not None else ttl
+
+    def get_many(self, user_ids: Iterable[str]) -> Dict[str, UserRecord]:
+        user_ids = list(user_ids)
+        found = self.local.get_many(user_ids)
+        USER_LOOKUPS.labels("local").inc(len(found))
+        missing = [user_id for user_id in user_ids if user_id not in found]
+        if missing and self.shared is not None:
+            try:
+                shared = self.shared.get_many(missing)
+            except redis.RedisError:
+                logger.warning("user_cache_unavailable", exc_info=True)
+                shared = {}
+            records = {key: orjson.loads(value) for key, value in shared.items()}
+            self.local.set_many(records, self.local_ttl)
+            USER_LOOKUPS.labels("shared").inc(len(records))
+            found.update(records)
+        return found
+
+    def set_many(self, records: Dict[str, UserRecord]) -> None:
+        self.local.set_many(records, self.local_ttl)
+        if self.shared is not None and records:
+            try:
+                self.shared.set_many(
+                    {key: orjson.dumps(record) for key, record in records.items()},
+                    self.ttl,
+                )
+            except redis.RedisError:
+                logger.warning("user_cache_unavailable", exc_info=True)
+
+    def invalidate(self, user_id: UUID) -> None:
+        self.local.delete(str(user_id))
+        if self.shared is not None:
+            try:
+                self.shared.delete(str(user_id))
+            except redis.RedisError:
+                logger.warning(
+                    "user_cache_invalidation_failed",
+                    user_id=str(user_id),
+                    exc_info=True,
+                )
+
+
+@lru_cache(maxsize=None)
+def get_user_cache() -> UserCache:
+    shared = None
+    if settings.USER_CACHE_BACKEND == "redis":
+        shared = RedisCache(settings.REDIS_URL, "users")
+    return UserCache(
+        MemoryCache(settings.USER_CACHE_MAX_ENTRIES),
+        shared,
+        ttl=settings.USER_CACHE_TTL_SECONDS,
+        local_ttl=settings.USER_CACHE_LOCAL_TTL_SECONDS,
+    )
+
+
+class UserService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_users(self, user_ids: List[UUID]) -> Tuple[List[UserRecord], List[str]]:
+        """Resolve ids to compact records, in request order.
+
+        Cached records are served as is; the rest are loaded in a single
+        query and cached, with a second one on the primary for ids a
+        replica doesn't have yet. Returns the records and the ids with no
+        user.
+        """
+        ids = list(dict.fromkeys(str(user_id) for user_id in user_ids))
+        cache = get_user_cache()
+        records = cache.get_many(ids)
+
+        missing = [user_id for user_id in ids if user_id not in records]
+        if missing:
+            query = self.db.query(
+                User.id, User.email, User.role, User.is_active, User.is_verified
+            )
+            with read_replica():
+                rows = query.filter(
+                    User.id.in_([UUID(user_id) for user_id in missing])
+                ).all()
+            unreplicated = set(missing) - {str(row.id) for row in rows}
+            if unreplicated and has_replicas():
+                # Accounts newer than what the replica has replayed
+                rows += query.filter(
+                    User.id.in_([UUID(user_id) for user_id in unreplicated])
+                ).all()
+            loaded = {
+                str(row.id): {
+                    "id": str(row.id),
+                    "email": row.email,
+                    "role": row.role.value,
+                    "is_active": bool(row.is_active),
+                    "is_verified": bool(row.is_verified),
+                }
+                for row in rows
+            }
+            USER_LOOKUPS.labels("database").inc(len(loaded))
+            cache.set_many(loaded)
+            records.update(loaded)
+
+        return (
+            [records[user_id] for user_id in ids if user_id in records],
+            [user_id for user_id in ids if user_id not in records],
+        )
@@ -0,0 +1,197 @@
+import os
+
+# Run side effects inline and keep them out of the network before the app
+# (and its settings) are imported
+os.environ.setdefault("JOBS_EAGER", "true")
+os.environ.setdefault("MAIL_BACKEND", "memory")
+os.environ.setdefault("AUDIT_ENABLED", "false")
+os.environ.setdefault("REFRESH_REUSE_CACHE", "memory")
+
+import io
+from contextlib import contextmanager
+
+import orjson
+import pytest
+from sqlalchemy import create_engine, make_url, text
+
+from src.app import create_app
+from src.core import security
+from src.core.database import db
+from src.core.log import configure_logging, shutdown_logging
+from src.models.user import RoleType, User
+from src.core.security import create_access_token, get_password_hash
+from tests.query_counter import QueryCounter
+
+TEST_PASSWORD = "Sup3r-secret!"
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "query_budget(n, allow_repeats=False): fail if any request made by the "
+        "test runs more than n SQL statements or repeats one",
+    )
+
+
+@contextmanager
+def worker_database():
+    """Yield the database URL for this test process.
+
+    By default every process (each pytest-xdist worker included) gets its
+    own in-memory SQLite database. With ``TEST_DATABASE_URL`` pointing at a
+    Postgres server, each worker gets a database of its own on it, named
+    after the configured one plus the worker id.
+    """
+    base_url = os.getenv("TEST_DATABASE_URL")
+    if not base_url:
+        yield "sqlite://"
+        return
+
+    url = make_url(base_url)
+    worker = os.getenv("PYTEST_XDIST_WORKER", "main")
+    name = f"{url.database}_{worker}"
+    admin = create_engine(url, isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        conn.execute(text(f'DROP DATABASE IF EXISTS "{name}"'))
+        conn.execute(text(f'CREATE DATABASE "{name}"'))
+    try:
+        yield url.set(database=name).render_as_string(hide_password=False)
+    finally:
+        with admin.connect() as conn:
+            conn.execute(text(f'DROP DATABASE IF EXISTS "{name}"'))
+        admin.dispose()
+
+
+@pytest.fixture(scope="session")
+def app():
+    with worker_database() as database_url:
+        app = create_app(
+            {
+                "TESTING": True,
+                "SQLALCHEMY_DATABASE_URI": database_url,
+                "SQLALCHEMY_BINDS": {},
+            }
+        )
+        # Requests reuse an app context that is already pushed, and with it
+        # g, so tests only push one briefly for setup; see ``make_user``
+        with app.app_context():
+            db.create_all()
+        yield app
+        with app.app_context():
+            # Only the default bind; other apps may have registered more
+            db.drop_all(bind_key=None)
+            for engine in db.engines.values():
+                engine.dispose()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _fast_password_hashing():
+    # Minimum bcrypt cost; the tests don't measure hashing strength
+    original = security.pwd_context
+    security.pwd_context = original.copy(bcrypt__rounds=4)
+    yield
+    security.pwd_context = original
+
+
+@pytest.fixture(autouse=True)
+def _clean_tables(app):
+    yield
+    with app.app_context():
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+        db.session.commit()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def query_budget(app):
+    """Assert that every request in the block stays within a query budget.
+
+    Usage::
+
+        with query_budget(2):
+            client.get("/api/v1/protected/user-info", headers=headers)
+    """
+
+    @contextmanager
+    def budget(n: int, allow_repeats: bool = False):
+        with QueryCounter(app) as counter:
+            yield counter
+        counter.check(n, allow_repeats)
+
+    return budget
+
+
+@pytest.fixture(autouse=True)
+def _query_budget_marker(request, app):
+    marker = request.node.get_closest_marker("query_budget")
+    if marker is None:
+        yield
+        return
+    with QueryCounter(app) as counter:
+        yield
+    counter.check(*marker.args, **marker.kwargs)
+
+
+@pytest.fixture
+def log_output(app):
+    """Send log output to a buffer; calling the fixture returns the events.
+
+    Calling it stops the listener thread, flushing what is queued, so call
+    it once, after the code under test ran.
+    """
+    stream = io.StringIO()
+    configure_logging(
+        level="DEBUG",
+        sample_rates=app.config["LOG_SAMPLE_RATES"],
+        queue_size=app.config["LOG_QUEUE_SIZE"],
+        stream=stream,
+    )
+
+    def events():
+        shutdown_logging()
+        return [orjson.loads(line) for line in stream.getvalue().splitlines()]
+
+    yield events
+    configure_logging(
+        level=app.config["LOG_LEVEL"],
+        levels=app.config["LOG_LEVELS"],
+        sample_rates=app.config["LOG_SAMPLE_RATES"],
+        queue_size=app.config["LOG_QUEUE_SIZE"],
+    )
+
+
+@pytest.fixture
+def make_user(app):
+    def make(email="user@example.com", role=RoleType.USER, **fields):
+        with app.app_context():
+            user = User(
+                email=email,
+                password_hash=get_password_hash(TEST_PASSWORD),
+                role=role,
+                **fields,
+            )
+            db.session.add(user)
+            db.session.commit()
+            db.session.refresh(user)
+            db.session.expunge(user)
+        return user
+
+    return make
+
+
+@pytest.fixture
+def user(make_user):
+    return make_user()
+
+
+@pytest.fixture
+def auth_headers():
+    def headers(user):
+        return {"Authorization": f"Bearer {create_access_token(user.id)}"}
+
+    return headers
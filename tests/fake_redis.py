@@ -0,0 +1,144 @@
+import fnmatch
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+
+def _bytes(value) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode()
+
+
+class FakeRedis:
+    """In-memory stand-in for the Redis commands used by the job queue.
+
+    Lists, sorted sets and plain keys are kept in dicts; keys come back as
+    bytes like redis-py returns them. ``register_script`` only knows the
+    queue's promote-due script.
+    """
+
+    def __init__(self):
+        self.lists: Dict[bytes, List[bytes]] = defaultdict(list)
+        self.zsets: Dict[bytes, Dict[bytes, float]] = defaultdict(dict)
+        self.values: Dict[bytes, bytes] = {}
+
+    # Lists
+
+    def lpush(self, key, *values) -> int:
+        items = self.lists[_bytes(key)]
+        for value in values:
+            items.insert(0, _bytes(value))
+        return len(items)
+
+    def llen(self, key) -> int:
+        return len(self.lists.get(_bytes(key), []))
+
+    def lrange(self, key, start: int, end: int) -> List[bytes]:
+        items = self.lists.get(_bytes(key), [])
+        return items[start : None if end == -1 else end + 1]
+
+    def lrem(self, key, count: int, value) -> int:
+        items = self.lists.get(_bytes(key), [])
+        value = _bytes(value)
+        if value in items:
+            items.remove(value)
+            return 1
+        return 0
+
+    def lmove(self, source, destination, src="RIGHT", dest="LEFT") -> Optional[bytes]:
+        items = self.lists.get(_bytes(source))
+        if not items:
+            return None
+        value = items.pop() if src == "RIGHT" else items.pop(0)
+        target = self.lists[_bytes(destination)]
+        if dest == "LEFT":
+            target.insert(0, value)
+        else:
+            target.append(value)
+        return value
+
+    def blmove(self, source, destination, timeout, src="RIGHT", dest="LEFT"):
+        return self.lmove(source, destination, src, dest)
+
+    # Sorted sets
+
+    def zadd(self, key, mapping: Dict) -> int:
+        zset = self.zsets[_bytes(key)]
+        for member, score in mapping.items():
+            zset[_bytes(member)] = score
+        return len(mapping)
+
+    def zcard(self, key) -> int:
+        return len(self.zsets.get(_bytes(key), {}))
+
+    # Keys
+
+    def set(self, key, value, ex=None, px=None) -> bool:
+        self.values[_bytes(key)] = _bytes(value)
+        return True
+
+    def get(self, key) -> Optional[bytes]:
+        return self.values.get(_bytes(key))
+
+    def exists(self, key) -> int:
+        key = _bytes(key)
+        return int(key in self.values or bool(self.lists.get(key)))
+
+    def delete(self, *keys) -> int:
+        deleted = 0
+        for key in map(_bytes, keys):
+            for store in (self.values, self.lists, self.zsets):
+                if store.pop(key, None) is not None:
+                    deleted = deleted + 1
+        return deleted
+
+    def scan_iter(self, match: str):
+        keys = set(self.values) | {key for key, items in self.lists.items() if items}
+        return [key for key in keys if fnmatch.fnmatchcase(key.decode(), match)]
+
+    # Pipelines and scripts
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+    def register_script(self, script: str):
+        def promote_due(keys, args):
+            delayed, queue = map(_bytes, keys)
+            now = float(args[0])
+            zset = self.zsets.get(delayed, {})
+            due = [member for member, score in zset.items() if score <= now]
+            for member in due:
+                del zset[member]
+                self.lpush(queue, member)
+            return len(due)
+
+        return promote_due
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        def command(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+
+        return command
+
+    def execute(self) -> list:
+        results = [
+            getattr(self.redis, name)(*args, **kwargs)
+            for name, args, kwargs in self.commands
+        ]
+        self.commands = []
+        return results
+
+
+def due_now(redis: FakeRedis, key: str) -> None:
+    """Make every job on the delayed set ``key`` due."""
+    zset = redis.zsets[_bytes(key)]
+    for member in zset:
+        zset[member] = time.time() - 1
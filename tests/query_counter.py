@@ -0,0 +1,84 @@
+import threading
+from collections import Counter
+from typing import List, Optional
+
+from flask import Flask, request, request_finished, request_started
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class RequestQueries:
+    """SQL statements executed while serving one request."""
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.statements: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+    def repeated(self) -> List[str]:
+        """Statements executed more than once, i.e. suspected N+1 queries."""
+        counts = Counter(self.statements)
+        return [statement for statement, count in counts.items() if count > 1]
+
+    def describe(self) -> str:
+        lines = [f"{len(self)} queries in {self.endpoint}:"]
+        lines += [
+            f"  {i}. {statement}" for i, statement in enumerate(self.statements, 1)
+        ]
+        return "\n".join(lines)
+
+
+class QueryCounter:
+    """Counts the SQL statements of each request served while active.
+
+    Statements are attributed to the request being served on the executing
+    thread, so queries issued by background threads (e.g. the audit log
+    flusher) or outside a request (test setup) are not counted.
+    """
+
+    def __init__(self, app: Flask):
+        self.app = app
+        self.requests: List[RequestQueries] = []
+        self._local = threading.local()
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(Engine, "before_cursor_execute", self._on_execute)
+        request_started.connect(self._on_request_started, self.app)
+        request_finished.connect(self._on_request_finished, self.app)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        request_finished.disconnect(self._on_request_finished, self.app)
+        request_started.disconnect(self._on_request_started, self.app)
+        event.remove(Engine, "before_cursor_execute", self._on_execute)
+
+    def _on_request_started(self, sender, **extra) -> None:
+        current = RequestQueries(f"{request.method} {request.path}")
+        self._local.current = current
+        self.requests.append(current)
+
+    def _on_request_finished(self, sender, **extra) -> None:
+        self._local.current = None
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        current: Optional[RequestQueries] = getattr(self._local, "current", None)
+        if current is not None:
+            current.statements.append(" ".join(statement.split()))
+
+    def check(self, budget: int, allow_repeats: bool = False) -> None:
+        """Fail if any request ran more than ``budget`` statements or, unless
+        ``allow_repeats``, ran the same statement twice."""
+        assert self.requests, "No request was made inside the query budget"
+        for queries in self.requests:
+            assert (
+                len(queries) <= budget
+            ), f"Query budget of {budget} exceeded\n{queries.describe()}"
+            if not allow_repeats:
+                repeated = queries.repeated()
+                assert not repeated, (
+                    "Suspected N+1: identical statements repeated in one request\n"
+                    + "\n".join(f"  {statement}" for statement in repeated)
+                    + f"\n{queries.describe()}"
+                )
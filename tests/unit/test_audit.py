@@ -0,0 +1,160 @@
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+import sqlalchemy as sa
+from prometheus_client import REGISTRY
+
+from src.core.database import db
+from src.models.audit import AuthEvent
+from src.models.user import User
+from src.services import audit
+from src.services.audit import audit_log
+
+
+@pytest.fixture
+def audit_enabled(app, monkeypatch):
+    """Enable the audit log, without its flusher thread unless a test
+    starts it; tests flush explicitly."""
+    monkeypatch.setattr(audit_log, "app", app)
+    monkeypatch.setattr(audit_log, "enabled", True)
+    monkeypatch.setattr(audit_log, "flush_size", 1000)
+    monkeypatch.setattr(audit_log, "flush_interval", 60.0)
+    monkeypatch.setattr(audit_log, "_pid", os.getpid())
+    yield audit_log
+    audit_log._events.clear()
+    audit_log._last_logins.clear()
+
+
+@pytest.fixture
+def statements(app):
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    sa.event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    sa.event.remove(engine, "before_cursor_execute", record)
+
+
+def stored_events(app):
+    with app.app_context():
+        return db.session.query(AuthEvent).order_by(AuthEvent.created_at).all()
+
+
+def load_user(app, user_id):
+    with app.app_context():
+        user = db.session.get(User, user_id)
+        db.session.expunge(user)
+        return user
+
+
+def dropped(reason):
+    return (
+        REGISTRY.get_sample_value("audit_events_dropped_total", {"reason": reason}) or 0
+    )
+
+
+def test_events_are_buffered_until_flushed(app, audit_enabled, user):
+    audit_log.record("login_failed", user.id, email=user.email, reason="inactive")
+    assert stored_events(app) == []
+
+    assert audit_log.flush() == 1
+    [event] = stored_events(app)
+    assert (event.event_type, event.user_id, event.reason) == (
+        "login_failed",
+        user.id,
+        "inactive",
+    )
+    assert audit_log.flush() == 0
+
+
+def test_flush_inserts_in_chunks(app, audit_enabled, statements, monkeypatch):
+    monkeypatch.setattr(audit, "INSERT_CHUNK_SIZE", 2)
+    for i in range(5):
+        audit_log.record("login_failed", email=f"user{i}@example.com")
+
+    assert audit_log.flush() == 5
+    inserts = [s for s in statements if s.startswith("INSERT INTO auth_events")]
+    assert len(inserts) == 3
+    assert len(stored_events(app)) == 5
+
+
+def test_last_login_is_coalesced_per_user(app, audit_enabled, statements, user):
+    updated_at = user.updated_at
+    audit_log.record("login_succeeded", user.id)
+    audit_log.record("token_refreshed", user.id)
+    audit_log.record("login_succeeded", user.id)
+    latest = audit_log._last_logins[user.id]
+
+    audit_log.flush()
+    updates = [s for s in statements if s.startswith("UPDATE users")]
+    assert len(updates) == 1
+
+    stored = load_user(app, user.id)
+    assert stored.last_login_at == latest
+    # Logins don't change the user's ETag
+    assert stored.updated_at == updated_at
+
+
+def test_older_login_does_not_overwrite_newer(app, audit_enabled, make_user):
+    newer = datetime.utcnow() + timedelta(hours=1)
+    user = make_user(last_login_at=newer)
+
+    audit_log.record("login_succeeded", user.id)
+    audit_log.flush()
+    assert load_user(app, user.id).last_login_at == newer
+
+
+def test_events_are_dropped_when_buffer_is_full(app, audit_enabled, monkeypatch):
+    monkeypatch.setattr(audit_log, "buffer_size", 2)
+    before = dropped("buffer_full")
+
+    for _ in range(3):
+        audit_log.record("login_failed", email="user@example.com")
+
+    assert dropped("buffer_full") == before + 1
+    assert audit_log.flush() == 2
+
+
+@pytest.fixture
+def flusher(audit_enabled, monkeypatch):
+    """Run the real flusher thread; stopped again after the test."""
+    monkeypatch.setattr(audit_log, "_pid", None)
+    yield audit_log
+    audit_log._stopping = True
+    audit_log._wakeup.set()
+    audit_log._thread.join(timeout=5)
+    audit_log._stopping = False
+    audit_log._wakeup.clear()
+    audit_log._pid = None
+
+
+def wait_for_events(app, count, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        events = stored_events(app)
+        if len(events) >= count:
+            return events
+        time.sleep(0.01)
+    pytest.fail(f"expected {count} flushed events")
+
+
+def test_flush_when_enough_events_are_waiting(app, flusher, monkeypatch):
+    monkeypatch.setattr(audit_log, "flush_size", 3)
+    for _ in range(3):
+        audit_log.record("login_failed", email="user@example.com")
+
+    # Long before the 60s interval
+    assert len(wait_for_events(app, 3, timeout=2.0)) == 3
+
+
+def test_flush_after_interval(app, flusher, monkeypatch):
+    monkeypatch.setattr(audit_log, "flush_interval", 0.05)
+    audit_log.record("login_failed", email="user@example.com")
+
+    assert len(wait_for_events(app, 1)) == 1
@@ -0,0 +1,240 @@
+from datetime import datetime, timedelta
+
+import pytest
+import redis
+from prometheus_client import REGISTRY
+
+from src.config.settings import settings
+from src.core.cache import MemoryCache, RedisCache
+from src.core.database import db
+from src.core.security import create_refresh_token, create_reset_token
+from src.models.user import PasswordResetToken, RefreshToken
+from tests.conftest import TEST_PASSWORD
+from tests.fake_redis import FakeRedis
+
+AUTH = "/api/v1/auth"
+
+
+def login(client, email="user@example.com", password=TEST_PASSWORD):
+    return client.post(f"{AUTH}/login", json={"email": email, "password": password})
+
+
+# Lookup, insert and the reload of the user expired by the commit
+@pytest.mark.query_budget(3)
+def test_register(client):
+    response = client.post(
+        f"{AUTH}/register",
+        json={"email": "new@example.com", "password": TEST_PASSWORD},
+    )
+    assert response.status_code == 201
+
+
+@pytest.mark.query_budget(1)
+def test_register_existing_email(client, user):
+    response = client.post(
+        f"{AUTH}/register", json={"email": user.email, "password": TEST_PASSWORD}
+    )
+    assert response.status_code == 400
+
+
+# Includes the reload of the user expired by the refresh token commit
+@pytest.mark.query_budget(3)
+def test_login(client, user):
+    response = login(client)
+    assert response.status_code == 200
+    assert response.get_json()["token_type"] == "bearer"
+
+
+@pytest.mark.query_budget(1)
+def test_login_wrong_password(client, user):
+    assert login(client, password="not-the-password").status_code == 401
+
+
+@pytest.mark.query_budget(3)
+def test_refresh(app, client, user):
+    refresh_token = create_refresh_token(user.id)
+    add_token(app, RefreshToken, user, refresh_token)
+
+    response = client.post(f"{AUTH}/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 200
+
+
+@pytest.mark.query_budget(2)
+def test_logout_all(client, user, auth_headers):
+    response = client.post(f"{AUTH}/logout-all", headers=auth_headers(user))
+    assert response.status_code == 200
+
+
+def test_introspect(client, make_user, auth_headers, query_budget, monkeypatch):
+    monkeypatch.setattr(settings, "INTERNAL_API_KEYS", ["test-key"])
+    users = [make_user(email=f"user{i}@example.com") for i in range(5)]
+    tokens = [auth_headers(u)["Authorization"].split()[1] for u in users]
+    tokens += [create_refresh_token(u.id) for u in users]
+
+    # The number of queries must not grow with the number of tokens
+    with query_budget(2):
+        response = client.post(
+            f"{AUTH}/introspect",
+            json={"tokens": tokens},
+            headers={"X-Internal-API-Key": "test-key"},
+        )
+    assert response.status_code == 200
+    assert len(response.get_json()["results"]) == len(tokens)
+
+
+def test_introspect_revoked_refresh_token(app, client, user, monkeypatch):
+    monkeypatch.setattr(settings, "INTERNAL_API_KEYS", ["test-key"])
+    refresh_token = create_refresh_token(user.id)
+    add_token(app, RefreshToken, user, refresh_token)
+
+    def introspect():
+        response = client.post(
+            f"{AUTH}/introspect",
+            json={"tokens": [refresh_token]},
+            headers={"X-Internal-API-Key": "test-key"},
+        )
+        return response.get_json()["results"][0]
+
+    result = introspect()
+    assert result["active"] is True
+    # Revocable at any time, so never cacheable
+    assert result["cache_ttl"] == 0
+
+    client.post(f"{AUTH}/refresh", json={"refresh_token": refresh_token})
+    assert introspect()["active"] is False
+
+
+# Includes the reload of the user expired by the commit
+@pytest.mark.query_budget(4)
+def test_forgot_password(client, user):
+    response = client.post(f"{AUTH}/forgot-password", json={"email": user.email})
+    assert response.status_code == 200
+
+
+@pytest.mark.query_budget(6)
+def test_reset_password(app, client, user):
+    token = create_reset_token(user.id)
+    add_token(app, PasswordResetToken, user, token)
+
+    response = client.post(
+        f"{AUTH}/reset-password",
+        json={"token": token, "new_password": "An0ther-secret!"},
+    )
+    assert response.status_code == 200
+
+
+def add_token(app, model, user, token):
+    with app.app_context():
+        db.session.add(
+            model(
+                user_id=user.id,
+                token=token,
+                expires_at=datetime.utcnow() + timedelta(days=1),
+            )
+        )
+        db.session.commit()
+
+
+def test_refresh_replay_within_window(app, client, user):
+    refresh_token = create_refresh_token(user.id)
+    add_token(app, RefreshToken, user, refresh_token)
+
+    first = client.post(f"{AUTH}/refresh", json={"refresh_token": refresh_token})
+    # A retry of the same refresh gets the pair of the first one
+    replay = client.post(f"{AUTH}/refresh", json={"refresh_token": refresh_token})
+    assert replay.status_code == 200
+    assert replay.get_json() == first.get_json()
+
+
+def refresh_in_two_processes(app, client, user, monkeypatch, first_cache, cache):
+    """Rotate a token with ``first_cache`` and replay it with ``cache``, the
+    rotation cache of another worker."""
+    caches = iter([first_cache])
+    monkeypatch.setattr(
+        "src.services.auth.get_rotation_cache", lambda: next(caches, cache)
+    )
+    refresh_token = create_refresh_token(user.id)
+    add_token(app, RefreshToken, user, refresh_token)
+
+    first = client.post(f"{AUTH}/refresh", json={"refresh_token": refresh_token})
+    replay = client.post(f"{AUTH}/refresh", json={"refresh_token": refresh_token})
+    return first, replay
+
+
+def cache_misses():
+    return (
+        REGISTRY.get_sample_value(
+            "refresh_token_replays_total", {"outcome": "cache_miss"}
+        )
+        or 0
+    )
+
+
+def test_refresh_replay_missing_from_the_local_cache(app, client, user, monkeypatch):
+    misses = cache_misses()
+    first, replay = refresh_in_two_processes(
+        app, client, user, monkeypatch, MemoryCache(), MemoryCache()
+    )
+
+    # Refused, but too recent to be treated as reuse
+    assert replay.status_code == 401
+    assert cache_misses() == misses + 1
+    response = client.post(
+        f"{AUTH}/refresh", json={"refresh_token": first.get_json()["refresh_token"]}
+    )
+    assert response.status_code == 200
+
+
+def test_refresh_replay_served_by_another_worker(app, client, user, monkeypatch):
+    shared = FakeRedis()
+    caches = []
+    for _ in range(2):
+        cache = RedisCache("redis://localhost:6379/0", "refresh-rotations")
+        cache.redis = shared
+        caches.append(cache)
+
+    first, replay = refresh_in_two_processes(app, client, user, monkeypatch, *caches)
+    assert replay.status_code == 200
+    assert replay.get_json() == first.get_json()
+
+
+class UnavailableCache:
+    def get(self, key, *args):
+        raise redis.ConnectionError("Connection refused")
+
+    set = delete = get
+
+
+def test_refresh_survives_rotation_cache_outage(app, client, user, monkeypatch):
+    monkeypatch.setattr(
+        "src.services.auth.get_rotation_cache", lambda: UnavailableCache()
+    )
+    refresh_token = create_refresh_token(user.id)
+    add_token(app, RefreshToken, user, refresh_token)
+
+    first = client.post(f"{AUTH}/refresh", json={"refresh_token": refresh_token})
+    assert first.status_code == 200
+    # Without the cached pair a replay is refused, not an error
+    replay = client.post(f"{AUTH}/refresh", json={"refresh_token": refresh_token})
+    assert replay.status_code == 401
+
+    response = client.post(
+        f"{AUTH}/refresh", json={"refresh_token": first.get_json()["refresh_token"]}
+    )
+    assert response.status_code == 200
+
+
+def test_refresh_reuse_after_window_revokes_family(client, user, monkeypatch):
+    monkeypatch.setattr(settings, "REFRESH_REUSE_WINDOW_SECONDS", 0)
+    refresh_token = login(client).get_json()["refresh_token"]
+
+    rotated = client.post(f"{AUTH}/refresh", json={"refresh_token": refresh_token})
+    reuse = client.post(f"{AUTH}/refresh", json={"refresh_token": refresh_token})
+    assert reuse.status_code == 401
+
+    # The token issued by the rotation is revoked along with it
+    response = client.post(
+        f"{AUTH}/refresh",
+        json={"refresh_token": rotated.get_json()["refresh_token"]},
+    )
+    assert response.status_code == 401
@@ -0,0 +1,97 @@
+import pytest
+from flask import request_started
+from werkzeug.test import Client
+from werkzeug.wrappers import Response
+
+from src.core.cors import CORSMiddleware
+
+PREFLIGHT = {
+    "Origin": "https://app.example.com",
+    "Access-Control-Request-Method": "POST",
+    "Access-Control-Request-Headers": "Authorization, Content-Type",
+}
+
+
+def restricted_client(**options):
+    options = {
+        "origins": ["https://app.example.com", "https://*.preview.example.com"],
+        "methods": ["GET", "POST"],
+        "headers": ["Authorization", "Content-Type"],
+        "max_age": 600,
+        **options,
+    }
+    return Client(CORSMiddleware(Response("ok"), **options))
+
+
+def test_preflight_short_circuits(app, client):
+    started = []
+    # Answered before Flask sees the request, so no hooks, auth or queries
+    with request_started.connected_to(lambda sender, **kw: started.append(1), app):
+        response = client.options("/api/v1/protected/user-info", headers=PREFLIGHT)
+    assert not started
+    assert response.status_code == 204
+    assert response.headers["Access-Control-Allow-Origin"] == "*"
+    assert response.headers["Access-Control-Allow-Methods"] == "POST"
+    assert (
+        response.headers["Access-Control-Allow-Headers"]
+        == "Authorization, Content-Type"
+    )
+    assert response.headers["Access-Control-Max-Age"] == "86400"
+
+
+def test_cross_origin_request(client):
+    response = client.get("/health", headers={"Origin": "https://app.example.com"})
+    assert response.status_code == 200
+    assert response.headers["Access-Control-Allow-Origin"] == "*"
+
+
+@pytest.mark.parametrize(
+    "origin, allowed",
+    [
+        ("https://app.example.com", True),
+        ("https://pr-12.preview.example.com", True),
+        ("https://evil.com", False),
+        ("https://app.example.com.evil.com", False),
+        ("https://evil.com/.preview.example.com", False),
+    ],
+)
+def test_origin_allow_list(origin, allowed):
+    client = restricted_client()
+    preflight = client.options("/", headers={**PREFLIGHT, "Origin": origin})
+    assert preflight.status_code == 204
+    assert ("Access-Control-Allow-Origin" in preflight.headers) == allowed
+
+    response = client.get("/", headers={"Origin": origin})
+    assert response.headers.get("Access-Control-Allow-Origin") == (
+        origin if allowed else None
+    )
+    # The response depends on the origin even when it's refused
+    assert "Origin" in response.headers["Vary"]
+
+
+def test_vary_without_origin():
+    response = restricted_client().get("/")
+    assert "Access-Control-Allow-Origin" not in response.headers
+    assert response.headers["Vary"] == "Origin"
+
+
+def test_no_vary_without_allow_list(client):
+    # Every origin gets the same "*" answer
+    assert "Vary" not in client.get("/health").headers
+
+
+def test_preflight_lists_configured_methods_and_headers():
+    response = restricted_client().options("/", headers=PREFLIGHT)
+    assert response.headers["Access-Control-Allow-Methods"] == "GET, POST"
+    assert (
+        response.headers["Access-Control-Allow-Headers"]
+        == "Authorization, Content-Type"
+    )
+    assert response.headers["Access-Control-Max-Age"] == "600"
+
+
+def test_plain_options_reaches_the_app():
+    response = restricted_client().options(
+        "/", headers={"Origin": "https://app.example.com"}
+    )
+    assert response.get_data() == b"ok"
@@ -0,0 +1,79 @@
+import pytest
+import sqlalchemy as sa
+from sqlalchemy import text
+
+from src.api.v1 import deps
+from src.core.circuit import CLOSED
+from src.core.database import db, db_breaker
+from tests.conftest import TEST_PASSWORD
+
+PROTECTED = "/api/v1/protected"
+
+
+@pytest.fixture
+def open_circuit():
+    """Trip the database circuit as consecutive connection errors would."""
+
+    def trip():
+        for _ in range(db_breaker.failure_threshold):
+            db_breaker.record_failure()
+
+    yield trip
+    db_breaker.record_success()
+    deps._user_snapshots.clear()
+
+
+def test_protected_route_served_from_snapshot(client, user, auth_headers, open_circuit):
+    headers = auth_headers(user)
+    assert client.get(f"{PROTECTED}/user-info", headers=headers).status_code == 200
+
+    open_circuit()
+    response = client.get(f"{PROTECTED}/user-info", headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()["email"] == user.email
+
+
+def test_protected_route_without_snapshot_fails_fast(
+    client, user, auth_headers, open_circuit
+):
+    open_circuit()
+    response = client.get(f"{PROTECTED}/user-info", headers=auth_headers(user))
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+
+
+@pytest.mark.query_budget(0)
+def test_login_fails_fast(client, user, open_circuit):
+    open_circuit()
+    response = client.post(
+        "/api/v1/auth/login", json={"email": user.email, "password": TEST_PASSWORD}
+    )
+    assert response.status_code == 503
+    assert response.get_json()["error"] == "ServiceUnavailableError"
+
+
+def test_circuit_closes_after_successful_trial(client, user, open_circuit):
+    open_circuit()
+    db_breaker._opened_at -= db_breaker.reset_timeout
+    response = client.post(
+        "/api/v1/auth/login", json={"email": user.email, "password": TEST_PASSWORD}
+    )
+    assert response.status_code == 200
+    assert db_breaker.state == CLOSED
+
+
+def test_query_errors_do_not_trip_the_circuit(app, open_circuit, log_output):
+    with app.test_request_context():
+        for _ in range(db_breaker.failure_threshold + 1):
+            with pytest.raises(sa.exc.OperationalError) as error:
+                db.session.execute(text("SELECT * FROM no_such_table"))
+            db.session.rollback()
+        assert db_breaker.state == CLOSED
+
+        body, status, headers = app.handle_user_exception(error.value)
+    assert status == 503
+
+    [event] = [e for e in log_output() if e["event"] == "database_error"]
+    assert event["level"] == "error"
+    assert "no_such_table" in event["error"]
+    assert "exception" not in event
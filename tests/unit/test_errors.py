@@ -0,0 +1,39 @@
+import pytest
+
+LOGIN = "/api/v1/auth/login"
+
+
+def test_method_not_allowed_keeps_allow_header(client):
+    response = client.get(LOGIN)
+    assert response.status_code == 405
+    assert response.get_json()["error"] == "MethodNotAllowed"
+    assert "POST" in response.headers["Allow"]
+    assert response.mimetype == "application/json"
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b'{"email": "user@example.com",',
+        b"",
+        b'["user@example.com", "password"]',
+        b'"user@example.com"',
+    ],
+    ids=["malformed", "empty", "array", "string"],
+)
+def test_invalid_body_is_a_validation_error(client, log_output, body):
+    response = client.post(LOGIN, data=body, content_type="application/json")
+
+    assert response.status_code == 422
+    assert response.get_json()["error"] == "ValidationError"
+    assert response.get_json()["details"]
+    # A client error: nothing logged as an application error
+    assert not [e for e in log_output() if e["level"] in ("error", "critical")]
+
+
+def test_invalid_field_is_reported(client):
+    response = client.post(LOGIN, json={"email": "not-an-email", "password": "x"})
+
+    assert response.status_code == 422
+    [detail] = response.get_json()["details"]
+    assert detail["loc"] == ["email"]
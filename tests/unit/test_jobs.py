@@ -0,0 +1,152 @@
+import re
+
+import orjson
+import pytest
+import redis
+
+from src.core.jobs import JobQueue, Worker, job_queue
+from src.services.email import memory_backend
+from tests.fake_redis import FakeRedis, due_now
+
+AUTH = "/api/v1/auth"
+
+
+@pytest.fixture
+def queue():
+    queue = JobQueue(prefix="test-jobs")
+    queue.redis = FakeRedis()
+    queue.max_attempts = 3
+    queue.backoff = 1.0
+    return queue
+
+
+@pytest.fixture
+def calls(queue):
+    calls = []
+
+    @queue.job("record")
+    def record(value):
+        calls.append(value)
+
+    @queue.job("explode")
+    def explode(value):
+        raise RuntimeError("boom")
+
+    return calls
+
+
+@pytest.fixture
+def outbox():
+    memory_backend.outbox.clear()
+    yield memory_backend.outbox
+    memory_backend.outbox.clear()
+
+
+def queued(queue, name="queue"):
+    return [orjson.loads(raw) for raw in queue.redis.lrange(queue.key(name), 0, -1)]
+
+
+def test_enqueue(queue, calls):
+    job_id = queue.enqueue("record", {"value": 1})
+
+    assert queued(queue) == [
+        {"id": job_id, "name": "record", "payload": {"value": 1}, "attempts": 0}
+    ]
+    assert calls == []
+
+
+def test_eager_enqueue_runs_inline(queue, calls):
+    queue.eager = True
+    queue.enqueue("record", {"value": 1})
+    assert calls == [1]
+    assert queued(queue) == []
+
+
+def test_worker_runs_jobs(queue, calls):
+    queue.enqueue("record", {"value": 1})
+    queue.enqueue("record", {"value": 2})
+
+    worker = Worker(queue)
+    worker.run(burst=True)
+
+    assert calls == [1, 2]
+    assert queued(queue) == []
+    assert queue.redis.llen(worker.processing_key) == 0
+    assert not queue.redis.exists(worker.heartbeat_key)
+
+
+def test_failed_job_is_retried_with_backoff(queue, calls, monkeypatch):
+    monkeypatch.setattr("src.core.jobs.time.time", lambda: 1000.0)
+    queue.enqueue("explode", {"value": 1})
+    worker = Worker(queue)
+    worker.process(queue.redis.lmove(queue.key("queue"), worker.processing_key))
+
+    [(raw, retry_at)] = queue.redis.zsets[queue.key("delayed").encode()].items()
+    job = orjson.loads(raw)
+    assert job["attempts"] == 1
+    assert "boom" in job["last_error"]
+    # First retry after the base backoff plus up to 50% jitter
+    assert 1001.0 <= retry_at <= 1001.5
+    assert queue.redis.llen(worker.processing_key) == 0
+
+
+def test_retry_delay_grows_exponentially(queue):
+    for attempts, base in [(1, 1.0), (2, 2.0), (3, 4.0)]:
+        assert base <= queue.retry_delay(attempts) <= base * 1.5
+
+
+def test_job_is_dead_lettered_after_max_attempts(queue, calls):
+    queue.enqueue("explode", {"value": 1})
+    worker = Worker(queue)
+    for _ in range(queue.max_attempts):
+        due_now(queue.redis, queue.key("delayed"))
+        worker.promote_due(keys=[queue.key("delayed"), queue.key("queue")], args=[1e12])
+        worker.process(queue.redis.lmove(queue.key("queue"), worker.processing_key))
+
+    [dead] = queued(queue, "dead")
+    assert dead["attempts"] == queue.max_attempts
+    assert queue.redis.zcard(queue.key("delayed")) == 0
+    assert queued(queue) == []
+
+
+def test_orphaned_jobs_are_recovered(queue, calls):
+    crashed = Worker(queue)
+    alive = Worker(queue)
+    for worker in (crashed, alive):
+        queue.enqueue("record", {"value": worker.worker_id})
+        queue.redis.lmove(queue.key("queue"), worker.processing_key)
+    # Only the live worker keeps its heartbeat
+    queue.redis.set(alive.heartbeat_key, 1)
+
+    Worker(queue).recover_orphaned_jobs()
+
+    assert [job["payload"]["value"] for job in queued(queue)] == [crashed.worker_id]
+    assert queue.redis.llen(alive.processing_key) == 1
+
+
+def test_forgot_password_emails_the_token(client, user, outbox):
+    response = client.post(f"{AUTH}/forgot-password", json={"email": user.email})
+
+    assert response.status_code == 200
+    assert "token" not in response.get_json()
+    [message] = outbox
+    assert message["To"] == user.email
+
+    # The emailed link carries a working reset token
+    token = re.search(r"token=(\S+)", message.get_content()).group(1)
+    response = client.post(
+        f"{AUTH}/reset-password",
+        json={"token": token, "new_password": "An0ther-secret!"},
+    )
+    assert response.status_code == 200
+
+
+def test_forgot_password_when_queue_is_down(client, user, outbox, monkeypatch):
+    def unavailable(name, payload):
+        raise redis.ConnectionError("Connection refused")
+
+    monkeypatch.setattr(job_queue, "enqueue", unavailable)
+    response = client.post(f"{AUTH}/forgot-password", json={"email": user.email})
+
+    assert response.status_code == 503
+    assert outbox == []
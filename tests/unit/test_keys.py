@@ -0,0 +1,165 @@
+from datetime import datetime, timedelta
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+from src.config.settings import settings
+from src.core.exceptions import TokenInvalidError
+from src.core.keys import _parse_datetime, get_key_ring
+from src.core.security import create_access_token, decode_token
+
+USER_INFO = "/api/v1/protected/user-info"
+
+
+def _pem(private_key) -> str:
+    return private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+
+
+RSA_PEM = _pem(rsa.generate_private_key(65537, 2048))
+ED25519_PEM = _pem(ed25519.Ed25519PrivateKey.generate())
+
+
+def iso(delta: timedelta) -> str:
+    return (datetime.utcnow() + delta).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+@pytest.fixture
+def configure_keys(app, monkeypatch):
+    # The decoder also allows HS256, so the key ring alone must reject
+    # tokens signed with the shared secret
+    monkeypatch.setitem(
+        app.config, "JWT_DECODE_ALGORITHMS", ["EdDSA", "RS256", "HS256"]
+    )
+
+    def configure(*keys):
+        monkeypatch.setattr(settings, "JWT_KEYS", list(keys))
+        get_key_ring.cache_clear()
+        return get_key_ring()
+
+    yield configure
+    get_key_ring.cache_clear()
+
+
+@pytest.fixture
+def two_keys(configure_keys):
+    return configure_keys(
+        {
+            "kid": "old",
+            "private_key": RSA_PEM,
+            "not_before": iso(-timedelta(days=30)),
+            "not_after": iso(timedelta(days=1)),
+        },
+        {
+            "kid": "new",
+            "private_key": ED25519_PEM,
+            "not_before": iso(-timedelta(days=1)),
+        },
+    )
+
+
+def forged_hs256(user) -> str:
+    now = datetime.utcnow()
+    claims = {
+        "sub": str(user.id),
+        "type": "access",
+        "iat": now,
+        "exp": now + timedelta(minutes=5),
+    }
+    return jwt.encode(claims, settings.JWT_SECRET_KEY, algorithm="HS256")
+
+
+def test_parse_datetime_accepts_z_suffix():
+    assert _parse_datetime("2026-10-01T00:00:00Z") == datetime(2026, 10, 1)
+    assert _parse_datetime("2026-10-01T02:00:00+02:00") == datetime(2026, 10, 1)
+
+
+def test_signs_with_most_recently_activated_key(two_keys):
+    token = create_access_token("00000000-0000-0000-0000-000000000001")
+    header = jwt.get_unverified_header(token)
+    assert header == {"alg": "EdDSA", "kid": "new", "typ": "JWT"}
+    assert decode_token(token)["type"] == "access"
+
+
+def test_future_key_is_published_but_does_not_sign(configure_keys):
+    key_ring = configure_keys(
+        {"kid": "current", "private_key": RSA_PEM},
+        {
+            "kid": "next",
+            "private_key": ED25519_PEM,
+            "not_before": iso(timedelta(days=1)),
+        },
+    )
+    assert key_ring.signing_key().kid == "current"
+    assert key_ring.verification_key("next") is not None
+
+
+def test_algorithm_is_pinned_to_the_key(two_keys, user):
+    # A token naming the RSA key but signed with its public key as an
+    # HMAC secret must not verify
+    token = jwt.encode(
+        {"sub": str(user.id), "type": "access"},
+        "not-the-rsa-key",
+        algorithm="HS256",
+        headers={"kid": "old"},
+    )
+    with pytest.raises(TokenInvalidError):
+        decode_token(token)
+
+    unknown = jwt.encode(
+        {"sub": str(user.id)}, "secret", algorithm="HS256", headers={"kid": "nope"}
+    )
+    with pytest.raises(TokenInvalidError):
+        decode_token(unknown)
+
+
+def test_retired_key_verifies_until_grace_period_ends(configure_keys):
+    key_ring = configure_keys(
+        {
+            "kid": "retired",
+            "private_key": RSA_PEM,
+            "not_after": iso(-timedelta(days=1)),
+        },
+        {"kid": "current", "private_key": ED25519_PEM},
+    )
+    now = datetime.utcnow()
+    assert key_ring.signing_key(now).kid == "current"
+    assert key_ring.verification_key("retired", now) is not None
+
+    after_grace = now + key_ring.grace
+    assert key_ring.verification_key("retired", after_grace) is None
+    body, _ = key_ring.jwks(after_grace)
+    assert b'"retired"' not in body
+
+
+def test_shared_secret_rejected_once_keys_are_configured(client, user, two_keys):
+    headers = {"Authorization": f"Bearer {forged_hs256(user)}"}
+    # Flask-JWT-Extended answers invalid tokens with 422
+    assert client.get(USER_INFO, headers=headers).status_code == 422
+    with pytest.raises(TokenInvalidError):
+        decode_token(forged_hs256(user))
+
+
+def test_shared_secret_accepted_during_migration(client, user, two_keys, monkeypatch):
+    monkeypatch.setattr(settings, "JWT_ACCEPT_HS256_UNTIL", iso(timedelta(days=1)))
+    headers = {"Authorization": f"Bearer {forged_hs256(user)}"}
+    assert client.get(USER_INFO, headers=headers).status_code == 200
+
+    monkeypatch.setattr(settings, "JWT_ACCEPT_HS256_UNTIL", iso(-timedelta(days=1)))
+    assert client.get(USER_INFO, headers=headers).status_code == 422
+
+
+def test_jwks_etag(client, two_keys):
+    response = client.get("/.well-known/jwks.json")
+    assert response.status_code == 200
+    assert {key["kid"] for key in response.get_json()["keys"]} == {"old", "new"}
+
+    not_modified = client.get(
+        "/.well-known/jwks.json", headers={"If-None-Match": response.headers["ETag"]}
+    )
+    assert not_modified.status_code == 304
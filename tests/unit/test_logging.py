@@ -0,0 +1,119 @@
+import io
+import logging
+import os
+
+import orjson
+import pytest
+
+from src.core import log
+from src.core.log import (
+    REQUEST_ID_HEADER,
+    configure_logging,
+    get_logger,
+    shutdown_logging,
+)
+
+LOGIN = "/api/v1/auth/login"
+
+
+@pytest.fixture
+def stream(app):
+    """Configure logging to a buffer, restoring the app's setup afterwards."""
+    stream = io.StringIO()
+    yield stream
+    configure_logging(
+        level=app.config["LOG_LEVEL"],
+        levels=app.config["LOG_LEVELS"],
+        sample_rates=app.config["LOG_SAMPLE_RATES"],
+        queue_size=app.config["LOG_QUEUE_SIZE"],
+    )
+
+
+def events(stream):
+    shutdown_logging()
+    return [orjson.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_request_id_is_logged_and_echoed(client, user, log_output):
+    response = client.post(
+        LOGIN,
+        json={"email": user.email, "password": "wrong-password"},
+        headers={REQUEST_ID_HEADER: "req-123"},
+    )
+
+    assert response.status_code == 401
+    assert response.headers[REQUEST_ID_HEADER] == "req-123"
+    [event] = [event for event in log_output() if event["event"] == "login_failed"]
+    assert event["request_id"] == "req-123"
+    assert event["level"] == "info"
+
+
+def test_request_id_is_generated_per_request(client):
+    first = client.get("/health").headers[REQUEST_ID_HEADER]
+    second = client.get("/health").headers[REQUEST_ID_HEADER]
+
+    assert len(first) == 32
+    assert first != second
+
+
+def test_request_id_does_not_leak_outside_requests(client, log_output):
+    client.get("/health", headers={REQUEST_ID_HEADER: "req-123"})
+    get_logger("tests").info("after_request")
+
+    [event] = [event for event in log_output() if event["event"] == "after_request"]
+    assert "request_id" not in event
+
+
+def test_events_are_sampled(stream):
+    configure_logging(sample_rates={"kept": 1.0, "dropped": 0.0}, stream=stream)
+    logger = get_logger("tests")
+    logger.info("kept")
+    logger.info("dropped")
+    logger.info("unsampled")
+
+    logged = {event["event"]: event for event in events(stream)}
+    assert set(logged) == {"kept", "unsampled"}
+    assert logged["kept"]["sample_rate"] == 1.0
+    assert "sample_rate" not in logged["unsampled"]
+
+
+def test_events_are_dropped_when_the_queue_is_full(stream, monkeypatch):
+    monkeypatch.setattr(log, "dropped_events", 0)
+    configure_logging(queue_size=1, stream=stream)
+    # With the listener stopped nothing drains the queue
+    shutdown_logging()
+    logger = get_logger("tests")
+    for i in range(3):
+        logger.info("burst", i=i)
+
+    assert log.dropped_events == 2
+    assert log._log_queue.qsize() == 1
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_forked_child_logs_through_a_new_queue(stream):
+    configure_logging(stream=stream)
+    parent_queue = log._log_queue
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            [handler] = logging.getLogger().handlers
+            get_logger("tests").info(
+                "child",
+                new_queue=log._log_queue is not parent_queue,
+                handler_queue=handler.queue is log._log_queue,
+            )
+            shutdown_logging()
+            os.write(write_end, stream.getvalue().encode())
+        finally:
+            os._exit(0)
+
+    os.close(write_end)
+    with os.fdopen(read_end) as child_output:
+        lines = child_output.read().splitlines()
+    os.waitpid(pid, 0)
+
+    [event] = [orjson.loads(line) for line in lines]
+    assert event["event"] == "child"
+    assert event["new_queue"] and event["handler_queue"]
@@ -0,0 +1,138 @@
+import os
+import time
+
+import orjson
+import pytest
+from flask import Flask, g, request
+
+from src.core import profiling
+from src.core.profiling import (
+    PROFILE_HEADER,
+    init_profiling,
+    sign_profile_token,
+    verify_profile_token,
+)
+
+SECRET = "profiling-secret"
+
+
+def make_app(tmp_path, **config):
+    app = Flask(__name__)
+    app.config.update(
+        {
+            "PROFILING_ENABLED": True,
+            "PROFILING_SECRET": SECRET,
+            "PROFILING_SAMPLE_RATE": 0.0,
+            "PROFILING_INTERVAL_MS": 1.0,
+            "PROFILING_DIR": str(tmp_path / "profiles"),
+            **config,
+        }
+    )
+
+    @app.before_request
+    def bind_request_id():
+        # Done by init_logging in the real app
+        g.request_id = request.headers.get("X-Request-ID", "")
+
+    @app.route("/slow")
+    def slow():
+        time.sleep(0.02)
+        return "ok"
+
+    init_profiling(app)
+    return app
+
+
+def profiles(app):
+    return sorted(os.listdir(app.config["PROFILING_DIR"]))
+
+
+def valid_token():
+    return sign_profile_token(SECRET, int(time.time()) + 60)
+
+
+def test_verify_profile_token():
+    assert verify_profile_token(SECRET, valid_token())
+
+
+@pytest.mark.parametrize(
+    "secret, token",
+    [
+        (SECRET, sign_profile_token(SECRET, int(time.time()) - 1)),
+        (SECRET, sign_profile_token("another-secret", int(time.time()) + 60)),
+        (SECRET, f"{int(time.time()) + 60}.not-a-signature"),
+        (SECRET, "not-a-token"),
+        ("", sign_profile_token("", int(time.time()) + 60)),
+    ],
+    ids=["expired", "wrong-secret", "bad-signature", "malformed", "no-secret"],
+)
+def test_verify_profile_token_rejects(secret, token):
+    assert not verify_profile_token(secret, token)
+
+
+def test_profile_is_written(tmp_path):
+    app = make_app(tmp_path)
+    response = app.test_client().get(
+        "/slow", headers={PROFILE_HEADER: valid_token(), "X-Request-ID": "req_1"}
+    )
+    assert response.status_code == 200
+
+    collapsed, speedscope = profiles(app)
+    base = speedscope.removesuffix(".speedscope.json")
+    assert collapsed == f"{base}.collapsed"
+    _, endpoint, duration, request_id = base.split("-", 3)
+    assert endpoint == "slow"
+    assert int(duration.removesuffix("ms")) >= 20
+    assert request_id == "req_1"
+
+    directory = app.config["PROFILING_DIR"]
+    with open(os.path.join(directory, speedscope), "rb") as f:
+        profile = orjson.loads(f.read())["profiles"][0]
+    assert profile["type"] == "sampled"
+    assert profile["endValue"] >= 20
+    assert len(profile["samples"]) == len(profile["weights"]) > 0
+    with open(os.path.join(directory, collapsed)) as f:
+        lines = f.read().splitlines()
+    # "frame;frame;... count", with the view in the sampled stacks
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any("slow (" in line for line in lines)
+
+
+def test_request_id_is_sanitized(tmp_path):
+    app = make_app(tmp_path)
+    app.test_client().get(
+        "/slow",
+        headers={PROFILE_HEADER: valid_token(), "X-Request-ID": "../../etc/pa ss" * 4},
+    )
+
+    for name in profiles(app):
+        assert "/" not in name and ".." not in name and " " not in name
+        request_id = name.split(".")[0].split("-", 3)[3]
+        assert request_id == "etcpass" * 4
+
+
+def test_invalid_token_is_not_profiled(tmp_path):
+    app = make_app(tmp_path, PROFILING_SAMPLE_RATE=1.0)
+    expired = sign_profile_token(SECRET, int(time.time()) - 1)
+    app.test_client().get("/slow", headers={PROFILE_HEADER: expired})
+    assert profiles(app) == []
+
+
+@pytest.mark.parametrize("draw, profiled", [(0.24, True), (0.25, False)])
+def test_sample_rate(tmp_path, monkeypatch, draw, profiled):
+    monkeypatch.setattr(profiling.random, "random", lambda: draw)
+    app = make_app(tmp_path, PROFILING_SAMPLE_RATE=0.25)
+    app.test_client().get("/slow")
+    assert bool(profiles(app)) == profiled
+
+
+def test_disabled(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling.random, "random", lambda: 0.0)
+    app = make_app(tmp_path, PROFILING_ENABLED=False, PROFILING_SAMPLE_RATE=1.0)
+
+    # Only the request id hook of the test app itself
+    assert [f.__name__ for f in app.before_request_funcs[None]] == ["bind_request_id"]
+    assert not app.after_request_funcs
+    assert not app.teardown_request_funcs
+    app.test_client().get("/slow", headers={PROFILE_HEADER: valid_token()})
+    assert not os.path.exists(app.config["PROFILING_DIR"])
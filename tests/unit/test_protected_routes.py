@@ -0,0 +1,76 @@
+import pytest
+import sqlalchemy as sa
+
+from src.core.database import db
+from src.models.user import RoleType, User
+
+PROTECTED = "/api/v1/protected"
+
+
+@pytest.mark.query_budget(1)
+def test_user_info(client, user, auth_headers):
+    response = client.get(f"{PROTECTED}/user-info", headers=auth_headers(user))
+    assert response.status_code == 200
+    assert response.get_json()["email"] == user.email
+
+
+@pytest.mark.query_budget(1)
+@pytest.mark.parametrize(
+    "path", ["/user-info", "/admin-only", "/user-and-admin", "/no-guests"]
+)
+@pytest.mark.parametrize("weak", [False, True])
+def test_not_modified(client, make_user, auth_headers, path, weak):
+    headers = auth_headers(make_user(role=RoleType.ADMIN))
+    etag = client.get(f"{PROTECTED}{path}", headers=headers).headers["ETag"]
+    if weak:
+        # As forwarded by a proxy that compressed the response
+        etag = f"W/{etag}"
+
+    response = client.get(
+        f"{PROTECTED}{path}", headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.get_data() == b""
+
+
+@pytest.mark.query_budget(1)
+def test_modified_user_gets_a_new_etag(app, client, user, auth_headers):
+    headers = auth_headers(user)
+    etag = client.get(f"{PROTECTED}/user-info", headers=headers).headers["ETag"]
+    with app.app_context():
+        db.session.execute(
+            sa.update(User).where(User.id == user.id).values(is_verified=True)
+        )
+        db.session.commit()
+
+    response = client.get(
+        f"{PROTECTED}/user-info", headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.get_json()["is_verified"] is True
+
+
+@pytest.mark.parametrize(
+    "path, role, status",
+    [
+        ("/admin-only", RoleType.ADMIN, 200),
+        ("/admin-only", RoleType.USER, 403),
+        ("/user-and-admin", RoleType.USER, 200),
+        ("/user-and-admin", RoleType.GUEST, 403),
+        ("/no-guests", RoleType.USER, 200),
+        ("/no-guests", RoleType.GUEST, 403),
+    ],
+)
+def test_role_protected(
+    client, make_user, auth_headers, query_budget, path, role, status
+):
+    user = make_user(role=role)
+    # Stacked role, login and caching decorators share one user lookup
+    with query_budget(1):
+        response = client.get(f"{PROTECTED}{path}", headers=auth_headers(user))
+    assert response.status_code == status
+
+
+@pytest.mark.query_budget(0)
+def test_missing_token(client):
+    assert client.get(f"{PROTECTED}/user-info").status_code == 401
@@ -0,0 +1,166 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.app import create_app
+from src.config.settings import settings
+from src.core import database
+from src.core.circuit import CLOSED
+from src.core.database import db, db_breaker, replica_monitor
+from src.core.security import create_access_token
+from src.models.user import RefreshToken, RoleType, User
+from src.services.users import get_user_cache
+
+PRIMARY_EMAIL = "primary@example.com"
+REPLICA_EMAIL = "replica@example.com"
+LATER = datetime.utcnow() + timedelta(days=1)
+
+
+@pytest.fixture
+def replica_app(tmp_path, monkeypatch):
+    """An app with a second SQLite database as its replica."""
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'primary.db'}",
+            "SQLALCHEMY_BINDS": {"replica_1": f"sqlite:///{tmp_path / 'replica.db'}"},
+        }
+    )
+    with app.app_context():
+        db.create_all()
+        db.metadata.create_all(db.engines["replica_1"])
+    set_replica_lag(monkeypatch, 0)
+    monkeypatch.setattr(settings, "INTERNAL_API_KEYS", ["test-key"])
+    yield app
+    get_user_cache().local.clear()
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def set_replica_lag(monkeypatch, seconds):
+    # SQLite can't run the Postgres lag query; report a fixed lag instead
+    monkeypatch.setattr(database, "REPLICA_LAG_QUERY", text(f"SELECT {seconds}"))
+    monkeypatch.setattr(replica_monitor, "_health", {})
+
+
+def add_user(app, bind=None, **fields):
+    with app.app_context():
+        session = db.session
+        if bind is not None:
+            session = Session(bind=db.engines[bind])
+        user = User(password_hash="x", role=RoleType.USER, **fields)
+        session.add(user)
+        session.commit()
+        user_id = user.id
+        session.close()
+    # Another worker served the write: no read-your-writes in this process
+    replica_monitor._recent_writes.clear()
+    return user_id
+
+
+def add_replicated_user(app, email=PRIMARY_EMAIL, replica_email=REPLICA_EMAIL):
+    user_id = add_user(app, email=email)
+    add_user(app, bind="replica_1", id=user_id, email=replica_email)
+    return user_id
+
+
+def user_info(app, user_id):
+    headers = {"Authorization": f"Bearer {create_access_token(user_id)}"}
+    response = app.test_client().get("/api/v1/protected/user-info", headers=headers)
+    return response.get_json()["email"]
+
+
+def test_reads_go_to_the_replica(replica_app):
+    user_id = add_replicated_user(replica_app)
+    assert user_info(replica_app, user_id) == REPLICA_EMAIL
+
+
+def test_lagging_replica_is_skipped(replica_app, monkeypatch):
+    user_id = add_replicated_user(replica_app)
+    set_replica_lag(monkeypatch, replica_app.config["REPLICA_MAX_LAG_SECONDS"] + 1)
+
+    assert user_info(replica_app, user_id) == PRIMARY_EMAIL
+
+
+def test_own_writes_are_read_from_the_primary(replica_app):
+    user_id = add_replicated_user(replica_app)
+    other_id = add_replicated_user(
+        replica_app, "other@example.com", "other-replica@example.com"
+    )
+    with replica_app.app_context():
+        db.session.add(RefreshToken(user_id=user_id, token="token", expires_at=LATER))
+        db.session.commit()
+
+    assert replica_monitor.wrote_recently(user_id)
+    assert user_info(replica_app, user_id) == PRIMARY_EMAIL
+    assert user_info(replica_app, other_id) == "other-replica@example.com"
+
+
+def test_bulk_writes_count_as_own_writes(replica_app):
+    user_id = add_replicated_user(replica_app)
+    headers = {"Authorization": f"Bearer {create_access_token(user_id)}"}
+
+    response = replica_app.test_client().post(
+        "/api/v1/auth/logout-all", headers=headers
+    )
+    assert response.status_code == 200
+    assert user_info(replica_app, user_id) == PRIMARY_EMAIL
+
+
+def test_own_writes_expire(replica_app, monkeypatch):
+    monkeypatch.setattr(replica_monitor, "read_your_writes_window", 0)
+    user_id = add_replicated_user(replica_app)
+    with replica_app.app_context():
+        db.session.add(RefreshToken(user_id=user_id, token="token", expires_at=LATER))
+        db.session.commit()
+
+    assert user_info(replica_app, user_id) == REPLICA_EMAIL
+
+
+def test_users_missing_on_the_replica_are_read_from_the_primary(replica_app):
+    user_id = add_user(replica_app, email=PRIMARY_EMAIL)
+    client = replica_app.test_client()
+    token = create_access_token(user_id)
+
+    response = client.get(
+        "/api/v1/protected/user-info", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200
+    assert response.get_json()["email"] == PRIMARY_EMAIL
+
+    internal = {"X-Internal-API-Key": "test-key"}
+    response = client.post(
+        "/api/v1/auth/introspect", json={"tokens": [token]}, headers=internal
+    )
+    assert response.get_json()["results"][0]["active"] is True
+
+    response = client.post(
+        "/api/v1/users/batch", json={"ids": [str(user_id)]}, headers=internal
+    )
+    assert response.get_json()["not_found"] == []
+    assert response.get_json()["users"][0]["email"] == PRIMARY_EMAIL
+
+
+def test_circuit_closes_after_a_trial_on_the_primary(replica_app):
+    user_id = add_replicated_user(replica_app)
+    headers = {"Authorization": f"Bearer {create_access_token(user_id)}"}
+    client = replica_app.test_client()
+    for _ in range(db_breaker.failure_threshold):
+        db_breaker.record_failure()
+    try:
+        # Replica reads don't depend on the primary's circuit
+        assert user_info(replica_app, user_id) == REPLICA_EMAIL
+        assert (
+            client.post("/api/v1/auth/logout-all", headers=headers).status_code == 503
+        )
+
+        db_breaker._opened_at -= db_breaker.reset_timeout
+        assert user_info(replica_app, user_id) == REPLICA_EMAIL
+        response = client.post("/api/v1/auth/logout-all", headers=headers)
+        assert response.status_code == 200
+        assert db_breaker.state == CLOSED
+    finally:
+        db_breaker.record_success()
@@ -0,0 +1,68 @@
+import uuid
+
+import pytest
+
+from src.config.settings import settings
+from src.core.security import create_reset_token
+from src.models.user import PasswordResetToken
+from src.services.users import get_user_cache
+from tests.unit.test_auth import add_token
+
+BATCH = "/api/v1/users/batch"
+HEADERS = {"X-Internal-API-Key": "test-key"}
+
+
+@pytest.fixture(autouse=True)
+def _internal_key(monkeypatch):
+    monkeypatch.setattr(settings, "INTERNAL_API_KEYS", ["test-key"])
+    yield
+    get_user_cache().local.clear()
+
+
+def test_batch_lookup(client, make_user, query_budget):
+    users = [make_user(email=f"user{i}@example.com") for i in range(5)]
+    unknown = str(uuid.uuid4())
+    ids = [str(u.id) for u in users] + [unknown]
+
+    # One query for every id, none once the records are cached
+    with query_budget(1):
+        response = client.post(BATCH, json={"ids": ids}, headers=HEADERS)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [record["id"] for record in body["users"]] == ids[:-1]
+    assert body["users"][0] == {
+        "id": ids[0],
+        "email": "user0@example.com",
+        "role": "user",
+        "is_active": True,
+        "is_verified": False,
+    }
+    assert body["not_found"] == [unknown]
+
+    with query_budget(0):
+        client.post(BATCH, json={"ids": ids[:-1]}, headers=HEADERS)
+
+
+def test_batch_lookup_requires_internal_key(client, user):
+    response = client.post(BATCH, json={"ids": [str(user.id)]})
+    assert response.status_code == 401
+
+
+def test_batch_lookup_limits_ids(client, monkeypatch):
+    ids = [str(uuid.uuid4()) for _ in range(settings.USER_BATCH_MAX_IDS + 1)]
+    response = client.post(BATCH, json={"ids": ids}, headers=HEADERS)
+    assert response.status_code == 422
+
+
+def test_password_reset_invalidates_cached_user(app, client, user):
+    client.post(BATCH, json={"ids": [str(user.id)]}, headers=HEADERS)
+    assert get_user_cache().local.get(str(user.id)) is not None
+
+    token = create_reset_token(user.id)
+    add_token(app, PasswordResetToken, user, token)
+    response = client.post(
+        "/api/v1/auth/reset-password",
+        json={"token": token, "new_password": "An0ther-secret!"},
+    )
+    assert response.status_code == 200
+    assert get_user_cache().local.get(str(user.id)) is None